@@ -0,0 +1,109 @@
+"""Vectorized chain evaluation for many boards at once.
+
+Boards are (N, BOARD_SIZE, BOARD_SIZE) integer arrays indexed [n, row, col]
+holding the cell codes below. Every detonation wave is computed for all N
+boards together with array shifts, following the same rules as
+engine.resolve_chain: each piece lands one tile away in each of its
+directions, hit pieces fire in the next wave and every piece fires once.
+"""
+import numpy as np
+from config import HORIZONTAL, DIAGONAL, PIECE_DIRECTIONS
+
+# Cell codes
+EMPTY = 0
+HORIZONTAL_CELL = 1
+DIAGONAL_CELL = 2
+TARGET_CELL = 3
+MONOLITH_CELL = 4
+
+PIECE_CELLS = {
+    HORIZONTAL: HORIZONTAL_CELL,
+    DIAGONAL: DIAGONAL_CELL
+}
+
+
+class BatchResult:
+    """Per-board outcome arrays, each of length N"""
+
+    def __init__(self, fired, landed, boards):
+        self.fired = fired  # (N, size, size) bool: pieces that fired
+        self.targets_hit_mask = landed & (boards == TARGET_CELL)
+        self.monoliths_hit_mask = landed & (boards == MONOLITH_CELL)
+        self.pieces_fired = fired.sum(axis=(1, 2))
+        self.targets_hit = self.targets_hit_mask.sum(axis=(1, 2))
+        self.monoliths_hit = self.monoliths_hit_mask.sum(axis=(1, 2))
+        self.total_targets = (boards == TARGET_CELL).sum(axis=(1, 2))
+
+    @property
+    def solved(self):
+        """True where every target was hit and no monolith was"""
+        return (self.targets_hit == self.total_targets) & (self.monoliths_hit == 0)
+
+
+def encode_board(board):
+    """Encode an engine.Board as a (size, size) cell-code array"""
+    array = np.zeros((board.size, board.size), dtype=np.int8)
+    for (col, row), piece_type in board.pieces.items():
+        array[row, col] = PIECE_CELLS[piece_type]
+    for col, row in board.targets:
+        array[row, col] = TARGET_CELL
+    for col, row in board.monoliths:
+        array[row, col] = MONOLITH_CELL
+    return array
+
+
+def encode_boards(boards):
+    """Stack engine.Boards into an (N, size, size) array"""
+    return np.stack([encode_board(board) for board in boards])
+
+
+def _shift(mask, dx, dy):
+    """Move every set cell of an (N, h, w) mask by (dx, dy), dropping cells that leave the board"""
+    shifted = np.zeros_like(mask)
+    height, width = mask.shape[1:]
+    src_rows = slice(max(0, -dy), height - max(0, dy))
+    dst_rows = slice(max(0, dy), height - max(0, -dy))
+    src_cols = slice(max(0, -dx), width - max(0, dx))
+    dst_cols = slice(max(0, dx), width - max(0, -dx))
+    shifted[:, dst_rows, dst_cols] = mask[:, src_rows, src_cols]
+    return shifted
+
+
+def _landings(frontier, boards):
+    """Tiles hit by every piece in frontier, for all boards"""
+    landed = np.zeros_like(frontier)
+    for piece_type, code in PIECE_CELLS.items():
+        firing = frontier & (boards == code)
+        if not firing.any():
+            continue
+        for dx, dy in PIECE_DIRECTIONS[piece_type]:
+            landed |= _shift(firing, dx, dy)
+    return landed
+
+
+def evaluate(boards, starts):
+    """Resolve one detonation per board.
+
+    boards is an (N, size, size) cell-code array and starts an (N, 2) array of
+    (col, row) starting cells. Boards whose start cell holds no piece fire
+    nothing.
+    """
+    boards = np.asarray(boards)
+    starts = np.asarray(starts)
+    count = boards.shape[0]
+    pieces = (boards == HORIZONTAL_CELL) | (boards == DIAGONAL_CELL)
+
+    frontier = np.zeros(boards.shape, dtype=bool)
+    frontier[np.arange(count), starts[:, 1], starts[:, 0]] = True
+    frontier &= pieces
+    fired = frontier.copy()
+    landed = np.zeros(boards.shape, dtype=bool)
+
+    # One pass per wave; a chain can never have more waves than pieces
+    while frontier.any():
+        wave = _landings(frontier, boards)
+        landed |= wave
+        frontier = wave & pieces & ~fired
+        fired |= frontier
+    return BatchResult(fired, landed, boards)
+
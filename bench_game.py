@@ -0,0 +1,244 @@
+"""Headless Game benchmark with scripted scenarios.
+
+Runs Game under SDL's dummy video driver and drives it with posted input
+events and direct game calls, one scenario at a time. Each scenario is run
+twice: once for timing, reporting mean/p95/p99 of update() and draw(), and
+once under tracemalloc for net allocated blocks and peak traced memory.
+Results can be saved as a baseline that later runs are compared against.
+
+The large_board scenario scrolls and zooms around a generated 512x512 board.
+
+Usage: python bench_game.py [--frames 600] [--baseline bench_baseline.json] [--save] [--only NAME]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from config import BOARD_SIZE, CELL_SIZE, HORIZONTAL, DIAGONAL, UNDO_BUTTON_X, UNDO_BUTTON_Y, BUTTON_WIDTH, BUTTON_HEIGHT
+from engine import cell_to_pixel
+from game import Game, SCROLL_KEYS
+from levels import Level, stress_level
+from pieces import ArtilleryPiece
+from simclock import STEP
+from tracing import set_level
+
+BASELINE_PATH = "bench_baseline.json"
+STATS = ("mean", "p95", "p99")
+LARGE_BOARD_SIZE = 512
+
+
+def post_mouse(event_type, pos):
+    if event_type == pygame.MOUSEMOTION:
+        pygame.event.post(pygame.event.Event(event_type, pos=pos, rel=(0, 0), buttons=(1, 0, 0)))
+    else:
+        pygame.event.post(pygame.event.Event(event_type, pos=pos, button=1))
+
+
+def center(piece):
+    return piece.x + CELL_SIZE // 2, piece.y + CELL_SIZE // 2
+
+
+def load_board(game, placed, tray=(), targets=(), monoliths=()):
+    """Load a fixed level with pieces already placed at the given (cell, piece_type) pairs"""
+    game.load_level(Level(0, 0, list(targets), list(monoliths), list(tray), [], placed=list(placed)))
+
+
+def long_drags(game):
+    """Drag one piece in a serpentine over every cell of the board, a few pixels per frame"""
+    load_board(game, [], tray=[DIAGONAL, HORIZONTAL])
+    path = []
+    for row in range(BOARD_SIZE):
+        cols = range(BOARD_SIZE) if row % 2 == 0 else reversed(range(BOARD_SIZE))
+        for col in cols:
+            path.append(cell_to_pixel((col, row)))
+    while True:
+        piece = game.pieces[0]
+        post_mouse(pygame.MOUSEBUTTONDOWN, center(piece))
+        yield
+        for (x, y), (next_x, next_y) in zip(path, path[1:]):
+            for i in range(1, 9):
+                pos = (x + (next_x - x) * i // 8 + CELL_SIZE // 2, y + (next_y - y) * i // 8 + CELL_SIZE // 2)
+                post_mouse(pygame.MOUSEMOTION, pos)
+                yield
+        post_mouse(pygame.MOUSEBUTTONUP, center(piece))
+        yield
+
+
+def chain_detonation(game):
+    """Eight placed pieces set off by firing only the first, restarted whenever the chain finishes"""
+    # Each piece's landing cells include the next piece's cell, so the chain runs through all eight
+    cells = [(0, 1), (1, 1), (2, 2), (3, 2), (4, 3), (5, 3), (6, 4), (7, 4)]
+    types = [HORIZONTAL, DIAGONAL] * 4
+    while True:
+        load_board(game, list(zip(cells, types)), targets=[(0, 7), (7, 0)], monoliths=[(3, 3)])
+        game.selected_piece = game.pieces[0]
+        game.start_detonation()
+        fired = 0
+        while game.detonation_sequence:
+            fired = game.current_detonation_index
+            yield
+        assert fired == len(cells), f"chain fired {fired} of {len(cells)} pieces"
+
+
+def particle_storm(game, live=1200):
+    """Keep at least `live` particles on screen by topping up with bursts"""
+    load_board(game, [])
+    rng = random.Random(0)
+    while True:
+        while len(game.particles) < live:
+            col, row = rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE)
+            x, y = cell_to_pixel((col, row))
+            game.particles.emit(x + CELL_SIZE // 2, y + CELL_SIZE // 2, (255, rng.randrange(256), 0), 40)
+        yield
+
+
+def undo_storm(game, moves=400, clicks_per_frame=10):
+    """Build a long move history, then click Undo many times per frame"""
+    undo_pos = (UNDO_BUTTON_X + BUTTON_WIDTH // 2, UNDO_BUTTON_Y + BUTTON_HEIGHT // 2)
+    while True:
+        load_board(game, [((0, 0), HORIZONTAL), ((7, 7), DIAGONAL)])
+        rng = random.Random(0)
+        for _ in range(moves):
+            piece = rng.choice(game.pieces)
+            old_x, old_y = piece.x, piece.y
+            new_x, new_y = cell_to_pixel((rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE)))
+            if not game.is_valid_placement(new_x, new_y):
+                continue
+            game.move_piece(piece, new_x, new_y)
+            game.save_move(piece, old_x, old_y, new_x, new_y)
+        while game.history.can_undo:
+            for _ in range(clicks_per_frame):
+                post_mouse(pygame.MOUSEBUTTONDOWN, undo_pos)
+            yield
+
+
+def large_board(game, size=LARGE_BOARD_SIZE):
+    """Scroll and zoom across a generated size x size board, detonating whatever is in view"""
+    game.load_level(stress_level(size))
+    rng = random.Random(0)
+    keys = list(SCROLL_KEYS)
+    frame = 0
+    while True:
+        if frame % 60 == 0:
+            pygame.event.post(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=rng.choice((-1, 1)), flipped=False))
+        if frame % 120 == 0 and not game.detonation_sequence:
+            for cell, obj in game.camera.visible_items(game.objects_at):
+                if isinstance(obj, ArtilleryPiece):
+                    game.selected_piece = obj
+                    game.start_detonation()
+                    break
+        for _ in range(4):
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(keys), mod=0, unicode="", scancode=0))
+        frame += 1
+        yield
+
+
+SCENARIOS = {
+    "long_drags": long_drags,
+    "chain_detonation": chain_detonation,
+    "particle_storm": particle_storm,
+    "undo_storm": undo_storm,
+    "large_board": large_board,
+}
+
+
+def run_frames(game, scenario, frames, timings=None):
+    script = scenario(game)
+    for _ in range(frames):
+        next(script)
+        start = time.perf_counter()
+        game.update(STEP)
+        middle = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+        if timings is not None:
+            timings["update"].append(middle - start)
+            timings["draw"].append(end - middle)
+
+
+def summarize(samples):
+    samples = np.array(samples) * 1000
+    return {"mean": float(samples.mean()),
+            "p95": float(np.percentile(samples, 95)),
+            "p99": float(np.percentile(samples, 99))}
+
+
+def bench_scenario(game, scenario, frames):
+    pygame.event.clear()
+    timings = {"update": [], "draw": []}
+    run_frames(game, scenario, frames, timings)
+    result = {phase: summarize(samples) for phase, samples in timings.items()}
+
+    # Memory is measured in a separate run, since tracemalloc slows everything down
+    pygame.event.clear()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run_frames(game, scenario, frames)
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result["alloc_blocks"] = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    result["peak_kib"] = peak / 1024
+    return result
+
+
+def change(value, old):
+    if not old:
+        return ""
+    return f"{(value - old) / old * 100:+.0f}%"
+
+
+def report(results, baseline):
+    print(f"{'scenario':<18} {'phase':<6} {'mean ms':>8} {'p95 ms':>8} {'p99 ms':>8}  vs baseline (mean/p95/p99)")
+    for name, result in results.items():
+        old = baseline.get(name, {})
+        for phase in ("update", "draw"):
+            stats = result[phase]
+            old_stats = old.get(phase, {})
+            changes = " ".join(change(stats[stat], old_stats.get(stat)) for stat in STATS)
+            print(f"{name:<18} {phase:<6} {stats['mean']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f}  {changes}")
+        print(f"{'':<18} memory: {result['alloc_blocks']} net blocks, {result['peak_kib']:.0f} KiB peak  "
+              f"{change(result['peak_kib'], old.get('peak_kib'))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600, help="frames per scenario")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--only", choices=sorted(SCENARIOS), action="append", help="run only these scenarios")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # Keep trace output out of the timings and the report
+    for subsystem in ("input", "projectile"):
+        set_level(subsystem, "error")
+    random.seed(0)
+    game = Game()
+    try:
+        results = {name: bench_scenario(game, SCENARIOS[name], args.frames)
+                   for name in args.only or SCENARIOS}
+    finally:
+        game.level_pool.close()
+        game.hints.close()
+    report(results, baseline)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
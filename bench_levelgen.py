@@ -0,0 +1,52 @@
+"""Level generator throughput benchmark.
+
+Generates a batch of levels for each level number and reports levels/sec and
+how often the rejection sampling had to retry, so late levels that stall on
+retries show up before players hit them.
+
+Usage: python bench_levelgen.py [--levels 30] [--count 500] [--seed 0] [--verify]
+"""
+import argparse
+import time
+from engine import resolve_chain
+from levels import generate_level, piece_count, target_count
+
+
+def bench_level(number, count, seed, verify):
+    retries = 0
+    worst = 0
+    start = time.perf_counter()
+    for offset in range(count):
+        level = generate_level(number, seed + offset)
+        retries += level.retries
+        worst = max(worst, level.retries)
+        if verify:
+            result = resolve_chain(level.solution_board, level.start)
+            assert result.all_targets_hit and not result.monoliths_hit, level
+    elapsed = time.perf_counter() - start
+    return count / elapsed, retries / count, retries / (count + retries), worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=30, help="highest level number to benchmark")
+    parser.add_argument("--count", type=int, default=500, help="levels generated per level number")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--verify", action="store_true", help="check every level's solution with the engine")
+    args = parser.parse_args()
+
+    print(f"{'level':>5} {'pieces':>6} {'targets':>7} {'levels/s':>10} "
+          f"{'retries/lvl':>11} {'reject %':>8} {'worst':>5}")
+    total = 0
+    total_time = 0
+    for number in range(1, args.levels + 1):
+        rate, retries, rejected, worst = bench_level(number, args.count, args.seed, args.verify)
+        total += args.count
+        total_time += args.count / rate
+        print(f"{number:>5} {piece_count(number):>6} {target_count(number):>7} {rate:>10.0f} "
+              f"{retries:>11.2f} {rejected * 100:>8.1f} {worst:>5}")
+    print(f"overall: {total / total_time:.0f} levels/s")
+
+
+if __name__ == "__main__":
+    main()
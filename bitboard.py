@@ -0,0 +1,164 @@
+"""Bitboard board representation.
+
+Every cell maps to one bit (index = row * BOARD_SIZE + col), so the 8x8 board
+fits in a 64-bit integer. Placement checks and detonation zones become a
+handful of integer operations against precomputed attack masks, and the
+solver searches directly on the masks. Chains themselves are resolved by
+engine.resolve_chain and HitGraph.
+"""
+from config import BOARD_SIZE, HORIZONTAL, PIECE_DIRECTIONS
+from engine import Board
+
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << NUM_CELLS) - 1
+
+
+def cell_index(cell):
+    return cell[1] * BOARD_SIZE + cell[0]
+
+
+def index_cell(index):
+    return index % BOARD_SIZE, index // BOARD_SIZE
+
+
+def cell_bit(cell):
+    return 1 << cell_index(cell)
+
+
+def in_bounds(cell):
+    return 0 <= cell[0] < BOARD_SIZE and 0 <= cell[1] < BOARD_SIZE
+
+
+def iter_bits(mask):
+    """Yield the index of every set bit, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_cells(mask):
+    return [index_cell(index) for index in iter_bits(mask)]
+
+
+def cells_mask(cells):
+    mask = 0
+    for cell in cells:
+        mask |= cell_bit(cell)
+    return mask
+
+
+# Column masks used to stop east/west shifts wrapping between rows
+FIRST_COLUMN = sum(1 << (row * BOARD_SIZE) for row in range(BOARD_SIZE))
+LAST_COLUMN = FIRST_COLUMN << (BOARD_SIZE - 1)
+
+
+def dilate(mask):
+    """Grow a mask by one tile in all eight directions"""
+    mask |= ((mask & ~LAST_COLUMN) << 1) | ((mask & ~FIRST_COLUMN) >> 1)
+    mask |= (mask << BOARD_SIZE) | (mask >> BOARD_SIZE)
+    return mask & FULL_MASK
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def _build_landing_table(directions):
+    """Per-cell list of the indices a piece firing in directions lands on"""
+    table = []
+    for index in range(NUM_CELLS):
+        col, row = index_cell(index)
+        landings = []
+        for dx, dy in directions:
+            landing = (col + dx, row + dy)
+            if in_bounds(landing):
+                landings.append(cell_index(landing))
+        table.append(tuple(landings))
+    return table
+
+
+# Precomputed landing indices in firing order: LANDINGS[piece_type][cell_index]
+LANDINGS = {piece_type: _build_landing_table(directions)
+            for piece_type, directions in PIECE_DIRECTIONS.items()}
+
+# Precomputed attack masks: ATTACKS[piece_type][cell_index]
+ATTACKS = {piece_type: [sum(1 << landing for landing in landings) for landings in table]
+           for piece_type, table in LANDINGS.items()}
+
+
+class BitBoard:
+    """Board state as one mask per piece type plus target and monolith masks"""
+
+    def __init__(self, pieces=None, targets=0, monoliths=0):
+        self.pieces = {piece_type: 0 for piece_type in ATTACKS}
+        if pieces:
+            self.pieces.update(pieces)
+        self.targets = targets
+        self.monoliths = monoliths
+
+    @classmethod
+    def from_board(cls, board):
+        """Build from an engine.Board"""
+        bitboard = cls(targets=cells_mask(board.targets),
+                       monoliths=cells_mask(board.monoliths))
+        for cell, piece_type in board.pieces.items():
+            bitboard.add_piece(cell, piece_type)
+        return bitboard
+
+    def to_board(self):
+        """Convert back to an engine.Board"""
+        pieces = {}
+        for piece_type, mask in self.pieces.items():
+            for cell in mask_cells(mask):
+                pieces[cell] = piece_type
+        return Board(pieces, mask_cells(self.targets), mask_cells(self.monoliths))
+
+    def copy(self):
+        return BitBoard(self.pieces, self.targets, self.monoliths)
+
+    @property
+    def piece_mask(self):
+        mask = 0
+        for piece_mask in self.pieces.values():
+            mask |= piece_mask
+        return mask
+
+    @property
+    def occupied(self):
+        return self.piece_mask | self.targets | self.monoliths
+
+    def in_bounds(self, cell):
+        return in_bounds(cell)
+
+    def is_empty(self, cell):
+        return in_bounds(cell) and not self.occupied & cell_bit(cell)
+
+    def piece_type_at(self, index):
+        bit = 1 << index
+        for piece_type, mask in self.pieces.items():
+            if mask & bit:
+                return piece_type
+        return None
+
+    def add_piece(self, cell, piece_type):
+        if in_bounds(cell):
+            self.pieces[piece_type] = self.pieces.get(piece_type, 0) | cell_bit(cell)
+
+    def remove_piece(self, cell, piece_type):
+        if in_bounds(cell):
+            self.pieces[piece_type] &= ~cell_bit(cell)
+
+    def attacks(self, cell, piece_type):
+        """Mask of the tiles a piece of piece_type on cell lands on"""
+        if not in_bounds(cell):
+            return 0
+        return ATTACKS.get(piece_type, ATTACKS[HORIZONTAL])[cell_index(cell)]
+
+    def zone_cells(self, cell, piece_type):
+        """The tiles of attacks() as a list of cells"""
+        return mask_cells(self.attacks(cell, piece_type))
+
+    def remove_target(self, cell):
+        if in_bounds(cell):
+            self.targets &= ~cell_bit(cell)
@@ -0,0 +1,119 @@
+"""Scrollable, zoomable view of the board.
+
+World coordinates are the board's pixel coordinates at CELL_SIZE, as used by
+engine.cell_to_pixel, however large the board is. The camera shows part of
+that world in the fixed board viewport on screen: offset is how far the
+board is scrolled, in screen pixels at the current zoom, and cell_size is
+the on-screen size of one cell. Drawing and hit tests only visit the cells
+inside the viewport, so their cost depends on the window, not the board.
+"""
+import pygame
+from config import BOARD_SIZE, BOARD_X, BOARD_Y, CELL_SIZE, VIEWPORT_CELLS, CAMERA_CELL_SIZES
+
+
+class Camera:
+    """Maps world pixels and board cells to screen pixels inside the viewport"""
+
+    def __init__(self, board_size=BOARD_SIZE):
+        self.viewport = pygame.Rect(BOARD_X, BOARD_Y, VIEWPORT_CELLS * CELL_SIZE, VIEWPORT_CELLS * CELL_SIZE)
+        self.reset(board_size)
+
+    def reset(self, board_size):
+        """Show the top-left corner of a board_size board at full zoom"""
+        self.board_size = board_size
+        self.cell_size = CAMERA_CELL_SIZES[0]
+        self.offset_x = 0
+        self.offset_y = 0
+
+    @property
+    def scale(self):
+        return self.cell_size / CELL_SIZE
+
+    def to_screen(self, x, y):
+        """World pixel position to screen; also works on NumPy arrays"""
+        scale = self.scale
+        return (BOARD_X + (x - BOARD_X) * scale - self.offset_x,
+                BOARD_Y + (y - BOARD_Y) * scale - self.offset_y)
+
+    def to_world(self, x, y):
+        scale = self.scale
+        return (BOARD_X + (x - BOARD_X + self.offset_x) / scale,
+                BOARD_Y + (y - BOARD_Y + self.offset_y) / scale)
+
+    def screen_to_cell(self, pos):
+        """Cell under a screen position, which may be outside the board"""
+        return ((pos[0] - BOARD_X + self.offset_x) // self.cell_size,
+                (pos[1] - BOARD_Y + self.offset_y) // self.cell_size)
+
+    def cell_rect(self, cell):
+        """Screen rect of a cell"""
+        return pygame.Rect(BOARD_X + cell[0] * self.cell_size - self.offset_x,
+                           BOARD_Y + cell[1] * self.cell_size - self.offset_y,
+                           self.cell_size, self.cell_size)
+
+    def board_rect(self):
+        """Screen rect of the part of the board inside the viewport"""
+        size = self.board_size * self.cell_size
+        return pygame.Rect(BOARD_X - self.offset_x, BOARD_Y - self.offset_y, size, size).clip(self.viewport)
+
+    def visible_range(self, rect=None):
+        """(first_col, first_row, last_col, last_row) of the cells at least partly inside rect (default: the viewport)"""
+        rect = self.viewport if rect is None else rect.clip(self.viewport)
+        left = rect.left - BOARD_X + self.offset_x
+        top = rect.top - BOARD_Y + self.offset_y
+        last = self.board_size - 1
+        return (max(0, left // self.cell_size),
+                max(0, top // self.cell_size),
+                min(last, (left + rect.width - 1) // self.cell_size),
+                min(last, (top + rect.height - 1) // self.cell_size))
+
+    def visible_items(self, cells, rect=None):
+        """(cell, value) pairs of a cell-keyed dict that are in view, or inside rect if given.
+
+        Walks whichever is smaller, the dict or the visible cells, so the cost
+        never grows with the size of the board.
+        """
+        first_col, first_row, last_col, last_row = self.visible_range(rect)
+        if len(cells) <= (last_col - first_col + 1) * (last_row - first_row + 1):
+            for cell, value in cells.items():
+                if first_col <= cell[0] <= last_col and first_row <= cell[1] <= last_row:
+                    yield cell, value
+            return
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                value = cells.get((col, row))
+                if value is not None:
+                    yield (col, row), value
+
+    def clamp(self):
+        limit = max(0, self.board_size * self.cell_size - self.viewport.width)
+        self.offset_x = max(0, min(limit, self.offset_x))
+        limit = max(0, self.board_size * self.cell_size - self.viewport.height)
+        self.offset_y = max(0, min(limit, self.offset_y))
+
+    def scroll(self, cols, rows):
+        """Scroll by whole cells; returns True if the view moved"""
+        old = (self.offset_x, self.offset_y)
+        self.offset_x += cols * self.cell_size
+        self.offset_y += rows * self.cell_size
+        self.clamp()
+        return (self.offset_x, self.offset_y) != old
+
+    def zoom(self, steps, anchor=None):
+        """Step through CAMERA_CELL_SIZES, zooming in for steps > 0; returns True if the zoom changed.
+
+        The board position under the screen point anchor (default: viewport center) stays put.
+        """
+        index = CAMERA_CELL_SIZES.index(self.cell_size)
+        index = max(0, min(len(CAMERA_CELL_SIZES) - 1, index - steps))
+        cell_size = CAMERA_CELL_SIZES[index]
+        if cell_size == self.cell_size:
+            return False
+        anchor_x, anchor_y = anchor or self.viewport.center
+        col = (anchor_x - BOARD_X + self.offset_x) / self.cell_size
+        row = (anchor_y - BOARD_Y + self.offset_y) / self.cell_size
+        self.cell_size = cell_size
+        self.offset_x = int(col * cell_size) - (anchor_x - BOARD_X)
+        self.offset_y = int(row * cell_size) - (anchor_y - BOARD_Y)
+        self.clamp()
+        return True
@@ -1,7 +1,6 @@
-import pygame
-
 # Game constants
-BOARD_SIZE = 8
+BOARD_SIZE = 8  # Campaign board; stress levels may be much larger
+VIEWPORT_CELLS = 8  # Board cells visible across the window at full zoom
 CELL_SIZE = 80
 TRAY_HEIGHT = 120
 UI_MARGIN = 20
@@ -15,6 +14,9 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
+PREVIEW_FIRE_COLOR = (255, 140, 0)  # Pieces the dragged piece's chain would fire
+PREVIEW_TARGET_COLOR = (220, 0, 0)  # Targets that chain would hit
+HINT_COLOR = (0, 190, 0)  # Cells the current hint points at
 
 # Button colors
 DETONATE_COLOR = (200, 0, 0)  # Darker red
@@ -27,6 +29,63 @@ BUTTON_SHADOW = (100, 100, 100)  # Shadow color
 HORIZONTAL = "horizontal"
 DIAGONAL = "diagonal"
 
+# Firing directions per piece type
+HORIZONTAL_DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # Up, right, down, left
+DIAGONAL_DIRECTIONS = [(1, -1), (1, 1), (-1, 1), (-1, -1)]  # Up-right, down-right, down-left, up-left
+PIECE_DIRECTIONS = {
+    HORIZONTAL: HORIZONTAL_DIRECTIONS,
+    DIAGONAL: DIAGONAL_DIRECTIONS
+}
+
+# Level generation limits
+MAX_LEVEL_PIECES = 8
+MAX_LEVEL_TARGETS = 5
+MAX_LEVEL_MONOLITHS = 4
+
+# Level pre-generation
+CAMPAIGN_SEED = 1  # Default seed, so repeated runs reuse cached levels
+PREGEN_LEVELS_AHEAD = 3  # Levels generated in the background ahead of the current one
+LEVEL_CACHE_DIR = "level_cache"
+LEVEL_CACHE_MAX_ENTRIES = 500
+
+# Simulation timing
+SIMULATION_HZ = 60  # Fixed simulation steps per second of game time
+MAX_SPEED_MULTIPLIER = 16  # Fastest detonation playback
+MAX_FRAME_TIME = 0.25  # Longest real frame time fed to the simulation, in seconds
+INSTANT_RESOLVE = False  # Skip detonation animations and jump to the result
+
+# Tracing
+TRACE_DEFAULT_LEVEL = "error"  # off, error, info or debug
+TRACE_LEVELS = {"input": "info"}  # Per-subsystem overrides, e.g. {"projectile": "debug"}
+TRACE_BUFFER_SIZE = 10000  # Buffered messages kept before the oldest are dropped
+TRACE_FLUSH_INTERVAL = 0.1  # Seconds between background writes
+
+# Profiling
+PROFILE_WINDOW = 300  # Frames in the rolling percentile window
+PROFILE_TRACE_FRAMES = 36000  # Frames kept for export (10 minutes at 60 FPS)
+PROFILE_EXPORT_PATH = "frame_profile.csv"  # F4 export target; use .json for JSON
+
+# Replays
+REPLAY_CHECKPOINT_INTERVAL = 60  # Frames between recorded state hashes
+
+# Undo history
+HISTORY_SNAPSHOT_INTERVAL = 32  # Moves between full snapshots of piece positions
+HISTORY_MAX_MOVES = 4096  # Moves kept for undo/redo; the level start is always kept
+
+# Hints
+HINT_MAX_NODES = 200000  # Solver search nodes per hint before giving up on the tray
+HINT_CACHE_SIZE = 256  # Board states whose hints are kept
+
+# Large boards
+CAMERA_CELL_SIZES = (CELL_SIZE, CELL_SIZE // 2, CELL_SIZE // 4, CELL_SIZE // 8)  # Zoom levels, pixels per cell
+STRESS_DENSITY = 0.02  # Fraction of a stress board's cells holding a piece
+STRESS_TRAY_PIECES = 4
+
+# Rendering
+DIRTY_RECT_RENDERING = True  # Redraw and push only changed screen regions
+MAX_DIRTY_REGIONS = 8  # Separately redrawn regions per frame; closest ones are merged beyond this
+MAX_PARTICLES = 2048  # Initial particle pool size, grows when full
+
 # Button dimensions
 BUTTON_WIDTH = 150
 BUTTON_HEIGHT = 40
@@ -34,8 +93,8 @@ BUTTON_MARGIN = 10
 BUTTON_SHADOW_OFFSET = 2  # Shadow offset in pixels
 
 # Calculate window dimensions
-WINDOW_WIDTH = BOARD_SIZE * CELL_SIZE + 2 * UI_MARGIN
-WINDOW_HEIGHT = UI_HEADER_HEIGHT + BOARD_SIZE * CELL_SIZE + TRAY_HEIGHT + 3 * UI_MARGIN
+WINDOW_WIDTH = VIEWPORT_CELLS * CELL_SIZE + 2 * UI_MARGIN
+WINDOW_HEIGHT = UI_HEADER_HEIGHT + VIEWPORT_CELLS * CELL_SIZE + TRAY_HEIGHT + 3 * UI_MARGIN
 
 # Calculate header positions
 HEADER_Y = UI_MARGIN
@@ -56,4 +115,4 @@ BOARD_X = UI_MARGIN
 BOARD_Y = HEADER_Y + UI_HEADER_HEIGHT + UI_MARGIN
 
 # Calculate tray position
-TRAY_Y = BOARD_Y + BOARD_SIZE * CELL_SIZE + UI_MARGIN 
\ No newline at end of file
+TRAY_Y = BOARD_Y + VIEWPORT_CELLS * CELL_SIZE + UI_MARGIN 
\ No newline at end of file
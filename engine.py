@@ -0,0 +1,251 @@
+"""Headless chain-reaction engine.
+
+Resolves a whole detonation on the logical grid without pygame, so levels can
+be validated, solved and checked on machines with no display. Game only has to
+replay the result as animation.
+"""
+from collections import deque, defaultdict
+from config import (BOARD_SIZE, BOARD_X, BOARD_Y, CELL_SIZE,
+                    HORIZONTAL_DIRECTIONS, PIECE_DIRECTIONS)
+
+
+def pixel_to_cell(x, y):
+    """Convert a top-left pixel position on the board to a (col, row) cell"""
+    return ((x + CELL_SIZE // 2 - BOARD_X) // CELL_SIZE,
+            (y + CELL_SIZE // 2 - BOARD_Y) // CELL_SIZE)
+
+
+def point_to_cell(x, y):
+    """Convert any pixel point (mouse position, projectile landing) to the cell containing it"""
+    return (x - BOARD_X) // CELL_SIZE, (y - BOARD_Y) // CELL_SIZE
+
+
+def cell_to_pixel(cell):
+    """Convert a (col, row) cell to the top-left pixel position of that tile"""
+    return BOARD_X + cell[0] * CELL_SIZE, BOARD_Y + cell[1] * CELL_SIZE
+
+
+class Board:
+    """Logical board: piece types, targets and monoliths keyed by (col, row).
+
+    Only occupied cells are stored, so this is also the cell store Game uses
+    for boards too large for a BitBoard; the methods below the landing cells
+    mirror the BitBoard ones Game calls.
+    """
+
+    def __init__(self, pieces=None, targets=(), monoliths=(), size=BOARD_SIZE):
+        self.size = size
+        self.pieces = dict(pieces or {})  # Cell -> piece type
+        self.targets = set(targets)
+        self.monoliths = set(monoliths)
+
+    @classmethod
+    def from_objects(cls, pieces, targets, monoliths, size=BOARD_SIZE):
+        """Build a board from the ArtilleryPiece/Target/Monolith objects Game uses"""
+        board = cls(size=size)
+        for piece in pieces:
+            # Pieces still in the tray are not part of the board
+            if not piece.in_tray:
+                board.pieces[pixel_to_cell(piece.x, piece.y)] = piece.piece_type
+        for target in targets:
+            board.targets.add(pixel_to_cell(target.x, target.y))
+        for monolith in monoliths:
+            board.monoliths.add(pixel_to_cell(monolith.x, monolith.y))
+        return board
+
+    @classmethod
+    def from_game(cls, game):
+        return cls.from_objects(game.pieces, game.targets, game.monoliths, game.level.size)
+
+    def copy(self):
+        return Board(self.pieces, self.targets, self.monoliths, self.size)
+
+    def in_bounds(self, cell):
+        return 0 <= cell[0] < self.size and 0 <= cell[1] < self.size
+
+    def is_empty(self, cell):
+        return (self.in_bounds(cell) and cell not in self.pieces and
+                cell not in self.targets and cell not in self.monoliths)
+
+    def landing_cells(self, cell, piece_type=None):
+        """Cells hit by a piece of piece_type standing on cell, in firing order"""
+        if piece_type is None:
+            piece_type = self.pieces[cell]
+        for dx, dy in PIECE_DIRECTIONS.get(piece_type, HORIZONTAL_DIRECTIONS):
+            landing = (cell[0] + dx, cell[1] + dy)
+            if self.in_bounds(landing):
+                yield landing
+
+    def zone_cells(self, cell, piece_type):
+        """Cells in the detonation zone of a piece of piece_type on cell"""
+        if not self.in_bounds(cell):
+            return []
+        return list(self.landing_cells(cell, piece_type))
+
+    def add_piece(self, cell, piece_type):
+        if self.in_bounds(cell):
+            self.pieces[cell] = piece_type
+
+    def remove_piece(self, cell, piece_type):
+        self.pieces.pop(cell, None)
+
+    def remove_target(self, cell):
+        self.targets.discard(cell)
+
+
+class ChainResult:
+    """Outcome of one detonation"""
+
+    def __init__(self, total_targets):
+        self.firing_order = []  # Piece cells in the order they fire
+        self.targets_hit = []  # Target cells in the order they are hit
+        self.monoliths_hit = []  # Monolith cells in the order they are hit
+        self.total_targets = total_targets
+
+    @property
+    def all_targets_hit(self):
+        return len(self.targets_hit) == self.total_targets
+
+    def __repr__(self):
+        return (f"ChainResult(firing_order={self.firing_order}, "
+                f"targets_hit={self.targets_hit}, monoliths_hit={self.monoliths_hit})")
+
+
+def resolve_chain(board, start):
+    """Resolve the detonation started by the piece on cell start.
+
+    Hit pieces fire in breadth-first order and every piece fires at most once.
+    """
+    result = ChainResult(len(board.targets))
+    if start not in board.pieces:
+        return result
+
+    queued = {start}
+    targets_hit = set()
+    monoliths_hit = set()
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        result.firing_order.append(cell)
+        for landing in board.landing_cells(cell):
+            if landing in board.targets:
+                if landing not in targets_hit:
+                    targets_hit.add(landing)
+                    result.targets_hit.append(landing)
+            elif landing in board.monoliths:
+                if landing not in monoliths_hit:
+                    monoliths_hit.add(landing)
+                    result.monoliths_hit.append(landing)
+            elif landing in board.pieces and landing not in queued:
+                queued.add(landing)
+                queue.append(landing)
+    return result
+
+
+class HitGraph:
+    """Directed who-hits-whom graph over the pieces of a board.
+
+    Each piece keeps the occupied cells its shots land on, in firing order,
+    and every cell keeps the pieces whose shots land on it. Adding or
+    removing one piece only touches its own landing cells and the pieces
+    aiming at its cell, so a move costs a handful of updates however large
+    the board is, and chain() only walks the pieces that actually fire.
+
+    key is a hash of the pieces and targets, XORed in and out as they change,
+    so it identifies the board state without walking it.
+    """
+
+    def __init__(self, board):
+        self.size = board.size
+        self.pieces = {}  # Cell -> piece type
+        self.targets = set(board.targets)
+        self.monoliths = set(board.monoliths)
+        self.landings = {}  # Piece cell -> in-bounds landing cells in firing order
+        self.edges = {}  # Piece cell -> occupied landing cells in firing order
+        self.hit_by = defaultdict(set)  # Cell -> piece cells whose shots land on it
+        self.key = hash((self.size, frozenset(self.monoliths)))
+        for cell in self.targets:
+            self.key ^= hash(("target", cell))
+        for cell, piece_type in board.pieces.items():
+            self.add_piece(cell, piece_type)
+
+    def in_bounds(self, cell):
+        return 0 <= cell[0] < self.size and 0 <= cell[1] < self.size
+
+    def occupied(self, cell):
+        return cell in self.pieces or cell in self.targets or cell in self.monoliths
+
+    def add_piece(self, cell, piece_type):
+        if not self.in_bounds(cell):
+            return
+        self.remove_piece(cell)  # Keeps key right if the cell was somehow still occupied
+        self.pieces[cell] = piece_type
+        self.key ^= hash((cell, piece_type))
+        landings = [(cell[0] + dx, cell[1] + dy)
+                    for dx, dy in PIECE_DIRECTIONS.get(piece_type, HORIZONTAL_DIRECTIONS)]
+        landings = [landing for landing in landings if self.in_bounds(landing)]
+        self.landings[cell] = landings
+        for landing in landings:
+            self.hit_by[landing].add(cell)
+        self.edges[cell] = [landing for landing in landings if self.occupied(landing)]
+        self.refresh_sources(cell)
+
+    def remove_piece(self, cell, piece_type=None):
+        removed = self.pieces.pop(cell, None)
+        if removed is None:
+            return
+        self.key ^= hash((cell, removed))
+        for landing in self.landings.pop(cell):
+            sources = self.hit_by[landing]
+            sources.discard(cell)
+            if not sources:
+                del self.hit_by[landing]
+        del self.edges[cell]
+        self.refresh_sources(cell)
+
+    def remove_target(self, cell):
+        if cell in self.targets:
+            self.targets.discard(cell)
+            self.key ^= hash(("target", cell))
+            self.refresh_sources(cell)
+
+    def to_board(self):
+        """Board copy of the current contents"""
+        return Board(self.pieces, self.targets, self.monoliths, self.size)
+
+    def refresh_sources(self, cell):
+        """Recompute the edges of the pieces aiming at cell after its contents changed"""
+        for source in self.hit_by.get(cell, ()):
+            self.edges[source] = [landing for landing in self.landings[source] if self.occupied(landing)]
+
+    def chain(self, start):
+        """Same result as resolve_chain on the board this graph mirrors"""
+        result = ChainResult(len(self.targets))
+        if start not in self.pieces:
+            return result
+        queued = {start}
+        seen = set()
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            result.firing_order.append(cell)
+            for landing in self.edges[cell]:
+                if landing in self.pieces:
+                    if landing not in queued:
+                        queued.add(landing)
+                        queue.append(landing)
+                elif landing not in seen:
+                    seen.add(landing)
+                    if landing in self.targets:
+                        result.targets_hit.append(landing)
+                    else:
+                        result.monoliths_hit.append(landing)
+        return result
+
+    def preview(self, cell, piece_type, start=None):
+        """Chain from start (default: cell) if a piece of piece_type stood on the empty cell"""
+        self.add_piece(cell, piece_type)
+        try:
+            return self.chain(start or cell)
+        finally:
+            self.remove_piece(cell)
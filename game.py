@@ -1,15 +1,82 @@
 import pygame
 import sys
+import argparse
 import random
+import hashlib
+from functools import partial
+import numpy as np
 from config import *
-from pieces import ArtilleryPiece, Target, Monolith, Projectile, Particle
+from pieces import ArtilleryPiece, Projectile, TRAILS, create_level_objects
+from particles import ParticleSystem
+from pregen import LevelPool
+from engine import Board, HitGraph, pixel_to_cell, point_to_cell
+from sprites import SPRITES, render_sprite
+from simclock import SimulationClock, STEP
+from tracing import get_tracer, flush as flush_trace
+from profiler import FrameProfiler
+from bitboard import BitBoard
+from camera import Camera
+from levels import stress_level
+from history import MoveHistory
+from hints import HintService
+
+PROJECTILE_TRACE = get_tracer("projectile")
+INPUT_TRACE = get_tracer("input")
+
+# Keys for moving through the undo history
+HISTORY_KEYS = {
+    pygame.K_z: "undo_last_move",
+    pygame.K_y: "redo_move",
+    pygame.K_r: "reset_level"
+}
+
+# Arrow keys scroll the board by one cell
+SCROLL_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1)
+}
+
+def merge_rects(rects, limit=MAX_DIRTY_REGIONS):
+    """Merge overlapping rects, then close pairs, and more until at most limit remain.
+
+    A pair is close when its union is at most twice the area of the two rects.
+    """
+    merged = []
+
+    def add(rect):
+        # Absorb every region this one overlaps; the grown rect may overlap more
+        overlap = rect.collidelist(merged)
+        while overlap != -1:
+            rect.union_ip(merged.pop(overlap))
+            overlap = rect.collidelist(merged)
+        merged.append(rect)
+
+    def waste(pair):
+        a, b = merged[pair[0]], merged[pair[1]]
+        union = a.union(b)
+        return union.w * union.h - a.w * a.h - b.w * b.h
+
+    for rect in rects:
+        if rect:
+            add(pygame.Rect(rect))
+    while len(merged) > 1:
+        i, j = min(((i, j) for i in range(len(merged)) for j in range(i + 1, len(merged))), key=waste)
+        # Nearby regions are cheaper to redraw once than to walk the scene twice
+        a, b = merged[i], merged[j]
+        if len(merged) <= limit and waste((i, j)) > a.w * a.h + b.w * b.h:
+            break
+        add(merged.pop(j).union(merged.pop(i)))
+    return merged
 
 class Game:
-    def __init__(self):
+    def __init__(self, level_number=1, seed=CAMPAIGN_SEED, rng_seed=None, board_size=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Artillery Chain Reaction")
         self.clock = pygame.time.Clock()
+        pygame.key.set_repeat(300, 50)  # Held arrow keys keep scrolling
         self.font = pygame.font.Font(None, 36)
         
         # Game state
@@ -20,18 +87,51 @@ class Game:
         self.dragged_piece = None
         self.selected_piece = None  # Track selected piece for detonation
         self.drag_offset = (0, 0)
-        self.move_history = []  # Track all moves for undo functionality
+        self.history = None  # MoveHistory of the current level, for undo, redo and reset
         self.detonation_brightness = {}  # Track brightness of each tile
+        self.zone_cells = {}  # Piece -> cell whose zone it currently adds to the brightness
         self.was_dragged = False  # Track if piece was actually moved
         self.projectiles = []  # Active projectiles
-        self.particles = []    # Active particles
-        self.detonation_sequence = []  # Pieces to detonate in order
+        # All gameplay randomness comes from rng_seed, so a recorded session replays exactly
+        self.rng_seed = rng_seed if rng_seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.rng_seed)
+        self.particles = ParticleSystem(rng=np.random.default_rng(self.rng_seed))    # Active particles
+        self.recorder = None  # InputRecorder while the session is being recorded
+        self.detonation_sequence = []  # Pieces to detonate, in the firing order resolved by the engine
+        self.detonation_targets = set()  # Target cells the resolved chain hits and that are still standing
         self.current_detonation_index = 0
-        self.detonation_delay = 0  # Frame counter for detonation timing
+        self.detonation_delay = 0  # Simulation steps until the next piece fires
+        self.sim_clock = SimulationClock()  # Animation time, independent of the frame rate
+        self.instant_resolve = INSTANT_RESOLVE  # Skip mode: detonations jump to their result
+        self.full_redraw = True  # Next frame redraws the whole window
+        self.static_dirty = False  # Static layer must be rebuilt, e.g. after the camera moved
+        self.dirty_rects = []  # Screen regions changed since the last frame
+        self.last_dynamic_rects = []  # Regions of moving objects drawn last frame
+        self.projectile_rects = []  # (projectile, screen rect) for this frame, shared by dirty tracking and culling
+        self.profiler = FrameProfiler()  # Per-phase frame timings, F3 overlay, F4 export
+        self.camera = Camera()  # Which part of the board the viewport shows
+        self.objects_at = {}  # Cell -> piece, target or monolith on the board
+        self.tray_slots = {}  # Tray slot index -> piece in it
+        self.hit_graph = None  # Who hits whom among the pieces on the board
+        self.chain_preview = None  # ChainResult predicted for the dragged piece's hovered cell
+        self.preview_cell = None  # Cell chain_preview was computed for
+        self.hints = HintService()  # Background hint search and its cache
+        self.show_hints = False  # H toggles a hint that follows every board change
+        self.hint = None  # Hint for the current board, once the search has found it
         
-        # Add test pieces
-        self.add_test_pieces()
-        self.update_detonation_zones()  # Initialize detonation zones
+        # Layers: the static one is drawn once, the scene layer is rebuilt only where it changes
+        self.static_layer = pygame.Surface(self.screen.get_size()).convert()
+        self.draw_static_layer(self.static_layer)
+        self.scene_layer = self.static_layer.copy()
+        
+        # Load the first level; later levels are generated in the background.
+        # A board_size asks for a large stress board instead of a campaign level.
+        self.level_pool = LevelPool(seed)
+        self.board_size = board_size
+        if board_size:
+            self.load_level(stress_level(board_size, seed))
+        else:
+            self.load_level(self.level_pool.get(level_number))
         
         # UI elements
         self.detonate_button = pygame.Rect(
@@ -51,80 +151,57 @@ class Game:
         self.detonate_hover = False
         self.undo_hover = False
         
-    def add_test_pieces(self):
-        # Add a horizontal artillery piece to the tray
-        self.pieces.append(ArtilleryPiece(
-            self,
-            BOARD_X + CELL_SIZE,  # First position in tray
-            TRAY_Y + (TRAY_HEIGHT - CELL_SIZE) // 2,
-            HORIZONTAL
-        ))
-        
-        # Add a diagonal artillery piece to the tray
-        self.pieces.append(ArtilleryPiece(
-            self,
-            BOARD_X + 2 * CELL_SIZE,  # Second position in tray
-            TRAY_Y + (TRAY_HEIGHT - CELL_SIZE) // 2,
-            DIAGONAL
-        ))
-        
-        # Add a target
-        self.targets.append(Target(
-            self,
-            BOARD_X + 3 * CELL_SIZE,
-            BOARD_Y + 3 * CELL_SIZE
-        ))
-        
-        # Add a monolith
-        self.monoliths.append(Monolith(
-            self,
-            BOARD_X + 5 * CELL_SIZE,
-            BOARD_Y + 5 * CELL_SIZE
-        ))
+    def load_level(self, level):
+        """Replace the board contents with a generated level"""
+        self.level = level
+        self.pieces, self.targets, self.monoliths = create_level_objects(self, level)
+        self.dragged_piece = None
+        self.selected_piece = None
+        self.history = MoveHistory(self.pieces)
+        self.projectiles = []
+        self.particles.clear()
+        self.detonation_sequence = []
+        self.detonation_targets = set()
+        self.current_detonation_index = 0
+        self.detonation_delay = 0
+        board = Board.from_game(self)
+        # Cell masks for fast lookups where they fit; larger boards keep only occupied cells
+        self.board = BitBoard.from_board(board) if level.size == BOARD_SIZE else board
+        self.hit_graph = HitGraph(board)
+        self.chain_preview = None
+        self.preview_cell = None
+        self.objects_at = {}
+        for obj in self.targets + self.monoliths:
+            self.objects_at[pixel_to_cell(obj.x, obj.y)] = obj
+        self.tray_slots = {}
+        for piece in self.pieces:
+            self.drop_piece(piece)
+        self.camera.reset(level.size)
+        self.update_detonation_zones()  # Initialize detonation zones
+        self.camera_moved()
+        self.board_changed()
+
+    def next_level(self):
+        """Advance to the next level, normally already generated by the level pool"""
+        self.load_level(self.level_pool.get(self.level.number + 1))
         
     def is_valid_placement(self, x, y):
-        # Convert from top-left to center coordinates
-        center_x = x + CELL_SIZE // 2
-        center_y = y + CELL_SIZE // 2
-        
-        # Check if position is in tray
-        if TRAY_Y <= center_y < TRAY_Y + TRAY_HEIGHT:
-            # For tray placement, only check for piece overlap
-            for piece in self.pieces:
-                if piece != self.dragged_piece:
-                    piece_center_x = piece.x + CELL_SIZE // 2
-                    piece_center_y = piece.y + CELL_SIZE // 2
-                    if abs(center_x - piece_center_x) < CELL_SIZE and abs(center_y - piece_center_y) < CELL_SIZE:
-                        return False
-            return True
-        
-        # For board placement, check bounds and all objects
-        if not (BOARD_X <= center_x < BOARD_X + BOARD_SIZE * CELL_SIZE and
-                BOARD_Y <= center_y < BOARD_Y + BOARD_SIZE * CELL_SIZE):
-            return False
-            
-        # Check if position overlaps with targets or monoliths
-        for target in self.targets:
-            target_center_x = target.x + CELL_SIZE // 2
-            target_center_y = target.y + CELL_SIZE // 2
-            if abs(center_x - target_center_x) < CELL_SIZE and abs(center_y - target_center_y) < CELL_SIZE:
-                return False
-                
-        for monolith in self.monoliths:
-            monolith_center_x = monolith.x + CELL_SIZE // 2
-            monolith_center_y = monolith.y + CELL_SIZE // 2
-            if abs(center_x - monolith_center_x) < CELL_SIZE and abs(center_y - monolith_center_y) < CELL_SIZE:
-                return False
-                
-        # Check if position overlaps with other pieces
-        for piece in self.pieces:
-            if piece != self.dragged_piece:
-                piece_center_x = piece.x + CELL_SIZE // 2
-                piece_center_y = piece.y + CELL_SIZE // 2
-                if abs(center_x - piece_center_x) < CELL_SIZE and abs(center_y - piece_center_y) < CELL_SIZE:
-                    return False
-                
-        return True
+        """Whether a piece can go on the board with its top-left corner at world position (x, y)"""
+        # Check bounds and occupancy of the target cell.
+        # The dragged piece is lifted off the board, so it never blocks itself.
+        return self.board.is_empty(point_to_cell(x + CELL_SIZE // 2, y + CELL_SIZE // 2))
+
+    def tray_slot_at(self, x):
+        """Tray slot under screen x, or holding a piece whose left edge is x"""
+        return (x - BOARD_X) // CELL_SIZE
+
+    def tray_slot_pos(self, slot):
+        """Screen top-left of a piece in a tray slot"""
+        return BOARD_X + slot * CELL_SIZE, TRAY_Y + (TRAY_HEIGHT - CELL_SIZE) // 2
+
+    def free_tray_slot(self):
+        """First empty tray slot, or None when the tray is full"""
+        return next((slot for slot in range(VIEWPORT_CELLS) if slot not in self.tray_slots), None)
         
     def snap_to_grid(self, x, y):
         # Convert from top-left to center coordinates
@@ -141,7 +218,35 @@ class Game:
         
         return grid_x, grid_y
         
-    def draw_header(self):
+    def mark_dirty(self, rect):
+        """Redraw a screen region on the next frame"""
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def mark_all_dirty(self):
+        """Redraw the whole window on the next frame"""
+        self.full_redraw = True
+
+    def cell_rect(self, cell):
+        return self.camera.cell_rect(cell)
+
+    def piece_rect(self, piece):
+        """Screen area a piece draws into, shadows included, wherever it is"""
+        pos, cell_size = self.piece_screen_pos(piece)
+        return pygame.Rect(pos, (cell_size, cell_size)).inflate(4, 4)
+
+    def piece_screen_pos(self, piece):
+        """Screen position and cell size to draw a piece with"""
+        if piece.in_tray:
+            return (piece.x, piece.y), CELL_SIZE
+        x, y = self.camera.to_screen(piece.x, piece.y)
+        return (int(x), int(y)), self.camera.cell_size
+
+    def camera_moved(self):
+        """Redraw everything after the view of the board changed"""
+        self.static_dirty = True  # Several scrolls in one frame rebuild the static layer once
+        self.mark_all_dirty()
+
+    def draw_header(self, surface):
         # Draw header background
         header_rect = pygame.Rect(
             UI_MARGIN,
@@ -149,105 +254,124 @@ class Game:
             WINDOW_WIDTH - 2 * UI_MARGIN,
             UI_HEADER_HEIGHT
         )
-        pygame.draw.rect(self.screen, GRAY, header_rect)
-        pygame.draw.rect(self.screen, BLACK, header_rect, 2)
-        
-        # Draw buttons and score
-        self.draw_buttons()
-        self.draw_score()
+        pygame.draw.rect(surface, GRAY, header_rect)
+        pygame.draw.rect(surface, BLACK, header_rect, 2)
         
-    def draw_board(self):
-        # Draw board background
-        board_rect = pygame.Rect(
-            BOARD_X,
-            BOARD_Y,
-            BOARD_SIZE * CELL_SIZE,
-            BOARD_SIZE * CELL_SIZE
-        )
-        pygame.draw.rect(self.screen, BLACK, board_rect)
+    def draw_board(self, surface):
+        # Draw board background, only the part in view
+        board_rect = self.camera.board_rect()
+        pygame.draw.rect(surface, BLACK, board_rect)
         
-        # Draw detonation zones with cumulative brightness
-        for (grid_x, grid_y), brightness in self.detonation_brightness.items():
-            # Calculate tile position
-            x = BOARD_X + grid_x * CELL_SIZE
-            y = BOARD_Y + grid_y * CELL_SIZE
-            
-            # Create a surface for the brightening effect
-            bright_surface = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-            
-            # Calculate brightness based on number of overlapping zones
-            # Max brightness is 255 (white) when 3 or more zones overlap
-            alpha = min(255, brightness * 85)  # 85 = 255/3
-            
-            # Fill with white at calculated alpha
-            bright_surface.fill((255, 255, 255, alpha))
-            self.screen.blit(bright_surface, (x, y))
-        
-        # Draw grid lines
-        for i in range(BOARD_SIZE + 1):
+        # Draw grid lines of the visible cells
+        first_col, first_row, last_col, last_row = self.camera.visible_range()
+        for col in range(first_col, last_col + 2):
             # Vertical lines
-            pygame.draw.line(
-                self.screen,
-                WHITE,
-                (BOARD_X + i * CELL_SIZE, BOARD_Y),
-                (BOARD_X + i * CELL_SIZE, BOARD_Y + BOARD_SIZE * CELL_SIZE)
-            )
+            x = self.camera.cell_rect((col, 0)).x
+            if board_rect.left <= x <= board_rect.right:
+                pygame.draw.line(surface, WHITE, (x, board_rect.top), (x, board_rect.bottom))
+        for row in range(first_row, last_row + 2):
             # Horizontal lines
-            pygame.draw.line(
-                self.screen,
-                WHITE,
-                (BOARD_X, BOARD_Y + i * CELL_SIZE),
-                (BOARD_X + BOARD_SIZE * CELL_SIZE, BOARD_Y + i * CELL_SIZE)
-            )
-        
+            y = self.camera.cell_rect((0, row)).y
+            if board_rect.top <= y <= board_rect.bottom:
+                pygame.draw.line(surface, WHITE, (board_rect.left, y), (board_rect.right, y))
+
+    def draw_zones(self, surface):
+        # Draw detonation zones with cumulative brightness.
+        # White over the white grid lines leaves them unchanged, so the grid can sit underneath.
+        tiles = {}  # Brightness -> cached zone tile
+        for cell, brightness in self.camera.visible_items(self.detonation_brightness, surface.get_clip()):
+            tile = tiles.get(brightness)
+            if tile is None:
+                tile = tiles[brightness] = self.zone_tile(brightness)
+            surface.blit(tile, self.camera.cell_rect(cell))
+
+    def zone_tile(self, brightness):
+        """White tile for a cell in brightness zones; full white when 3 or more overlap"""
+        alpha = min(255, brightness * 85)  # 85 = 255/3
+        return SPRITES.get(("zone", alpha), self.camera.cell_size,
+                           lambda cell_size: render_sprite(partial(self.render_zone, alpha), cell_size))
+
+    def render_zone(self, alpha, surface, x, y, cell_size):
+        surface.fill((255, 255, 255, alpha), (x, y, cell_size, cell_size))
+
+    def update_chain_preview(self):
+        """Predict the chain for the dragged piece's hovered cell when that cell changes"""
+        cell = self.piece_zone_cell(self.dragged_piece)
+        if cell == self.preview_cell:
+            return
+        self.preview_cell = cell
+        self.mark_preview_dirty()
+        self.chain_preview = None
+        if cell is not None and self.board.is_empty(cell):
+            # The chain starts from the selected piece if it stays on the board
+            start = None
+            selected = self.selected_piece
+            if selected and selected is not self.dragged_piece and not selected.in_tray:
+                start = pixel_to_cell(selected.x, selected.y)
+            self.chain_preview = self.hit_graph.preview(cell, self.dragged_piece.piece_type, start)
+        self.mark_preview_dirty()
+
+    def mark_preview_dirty(self):
+        if self.chain_preview:
+            for cell in self.chain_preview.firing_order + self.chain_preview.targets_hit:
+                self.mark_dirty(self.cell_rect(cell))
+
+    def draw_chain_preview(self, surface):
+        """Outline the pieces the previewed chain fires and the targets it hits"""
+        if self.chain_preview:
+            self.draw_outlines(surface, self.chain_preview.firing_order, PREVIEW_FIRE_COLOR)
+            self.draw_outlines(surface, self.chain_preview.targets_hit, PREVIEW_TARGET_COLOR)
+
+    def draw_hint(self, surface):
+        """Outline the cell to place the hinted piece on and the piece to fire first"""
+        if self.hint:
+            self.draw_outlines(surface, self.hint.cells, HINT_COLOR)
+
+    def draw_outlines(self, surface, cells, color):
+        outline = SPRITES.get(("outline", color), self.camera.cell_size,
+                              lambda cell_size: render_sprite(partial(self.render_outline, color), cell_size))
+        for cell in cells:
+            surface.blit(outline, self.camera.cell_rect(cell))
+
+    def render_outline(self, color, surface, x, y, cell_size):
+        """Draw an outline just inside the cell whose top-left corner is (x, y)"""
+        pygame.draw.rect(surface, color, (x, y, cell_size, cell_size), max(1, cell_size // 20))
+
+    def draw_selection(self, surface):
         # Draw glowing border for selected piece
-        if self.selected_piece and self.selected_piece.y < TRAY_Y:
+        if self.selected_piece and not self.selected_piece.in_tray:
             # Calculate cell position
-            cell_x = ((self.selected_piece.x + CELL_SIZE // 2) - BOARD_X) // CELL_SIZE
-            cell_y = ((self.selected_piece.y + CELL_SIZE // 2) - BOARD_Y) // CELL_SIZE
+            rect = self.camera.cell_rect(pixel_to_cell(self.selected_piece.x, self.selected_piece.y))
             
-            # Draw outer glow
-            glow_rect = pygame.Rect(
-                BOARD_X + cell_x * CELL_SIZE - 2,
-                BOARD_Y + cell_y * CELL_SIZE - 2,
-                CELL_SIZE + 4,
-                CELL_SIZE + 4
-            )
-            pygame.draw.rect(self.screen, (255, 255, 255, 200), glow_rect, 4)
-            
-            # Draw inner glow
-            glow_rect = pygame.Rect(
-                BOARD_X + cell_x * CELL_SIZE - 1,
-                BOARD_Y + cell_y * CELL_SIZE - 1,
-                CELL_SIZE + 2,
-                CELL_SIZE + 2
-            )
-            pygame.draw.rect(self.screen, (255, 255, 255, 100), glow_rect, 2)
+            # Draw the cached glow sprite, which overhangs the cell by 2 pixels
+            glow = SPRITES.get(("selection",), self.camera.cell_size, self.render_selection_sprite)
+            surface.blit(glow, (rect.x - 2, rect.y - 2))
+    
+    def render_selection_sprite(self, cell_size):
+        return render_sprite(self.render_selection_glow, cell_size, margin=2)
+
+    def render_selection_glow(self, surface, x, y, cell_size):
+        """Draw the glowing border of a selected cell whose top-left corner is (x, y)"""
+        # Draw outer glow
+        glow_rect = pygame.Rect(x - 2, y - 2, cell_size + 4, cell_size + 4)
+        pygame.draw.rect(surface, WHITE, glow_rect, 4)
         
-        # Draw pieces
-        for piece in self.pieces:
-            piece.draw(self.screen)
-            
-        # Draw targets
-        for target in self.targets:
-            target.draw(self.screen)
-            
-        # Draw monoliths
-        for monolith in self.monoliths:
-            monolith.draw(self.screen)
+        # Draw inner glow
+        glow_rect = pygame.Rect(x - 1, y - 1, cell_size + 2, cell_size + 2)
+        pygame.draw.rect(surface, WHITE, glow_rect, 2)
     
-    def draw_tray(self):
+    def draw_tray(self, surface):
         # Draw tray background
         tray_rect = pygame.Rect(
             BOARD_X,
             TRAY_Y,
-            BOARD_SIZE * CELL_SIZE,
+            VIEWPORT_CELLS * CELL_SIZE,
             TRAY_HEIGHT
         )
-        pygame.draw.rect(self.screen, GRAY, tray_rect)
-        pygame.draw.rect(self.screen, BLACK, tray_rect, 2)
+        pygame.draw.rect(surface, GRAY, tray_rect)
+        pygame.draw.rect(surface, BLACK, tray_rect, 2)
     
-    def draw_buttons(self):
+    def draw_buttons(self, surface):
         # Draw detonate button shadow
         shadow_rect = pygame.Rect(
             self.detonate_button.x + BUTTON_SHADOW_OFFSET,
@@ -255,13 +379,13 @@ class Game:
             BUTTON_WIDTH,
             BUTTON_HEIGHT
         )
-        pygame.draw.rect(self.screen, BUTTON_SHADOW, shadow_rect)
+        pygame.draw.rect(surface, BUTTON_SHADOW, shadow_rect)
         
         # Draw detonate button
         button_color = DETONATE_HOVER if self.detonate_hover else DETONATE_COLOR
-        pygame.draw.rect(self.screen, button_color, self.detonate_button)
+        pygame.draw.rect(surface, button_color, self.detonate_button)
         detonate_text = self.font.render("Detonate", True, WHITE)
-        self.screen.blit(
+        surface.blit(
             detonate_text,
             (
                 self.detonate_button.x + (BUTTON_WIDTH - detonate_text.get_width()) // 2,
@@ -276,13 +400,13 @@ class Game:
             BUTTON_WIDTH,
             BUTTON_HEIGHT
         )
-        pygame.draw.rect(self.screen, BUTTON_SHADOW, shadow_rect)
+        pygame.draw.rect(surface, BUTTON_SHADOW, shadow_rect)
         
         # Draw undo button
         button_color = UNDO_HOVER if self.undo_hover else UNDO_COLOR
-        pygame.draw.rect(self.screen, button_color, self.undo_button)
+        pygame.draw.rect(surface, button_color, self.undo_button)
         undo_text = self.font.render("Undo", True, WHITE)
-        self.screen.blit(
+        surface.blit(
             undo_text,
             (
                 self.undo_button.x + (BUTTON_WIDTH - undo_text.get_width()) // 2,
@@ -290,69 +414,166 @@ class Game:
             )
         )
     
-    def draw_score(self):
+    def draw_score(self, surface):
         score_text = self.font.render(f"Score: {self.score}", True, BLACK)
-        self.screen.blit(score_text, (SCORE_X, SCORE_Y))
+        surface.blit(score_text, (SCORE_X, SCORE_Y))
     
-    def save_move(self, piece, old_x, old_y, new_x, new_y):
+    def save_move(self, piece, old_x, old_y, new_x, new_y, old_in_tray=False, new_in_tray=False):
         """Save a move to the history for undo functionality"""
-        self.move_history.append({
-            'piece': piece,
-            'old_x': old_x,
-            'old_y': old_y,
-            'new_x': new_x,
-            'new_y': new_y
-        })
+        self.history.record(piece, (old_x, old_y, old_in_tray), (new_x, new_y, new_in_tray))
+        self.board_changed()
         
     def undo_last_move(self):
         """Undo the last move in the history"""
-        if self.move_history:
-            move = self.move_history.pop()
-            move['piece'].x = move['old_x']
-            move['piece'].y = move['old_y']
-            return True
-        return False
+        return self.apply_moves(self.history.undo())
+
+    def redo_move(self):
+        """Redo the last undone move"""
+        return self.apply_moves(self.history.redo())
+
+    def jump_to_move(self, move):
+        """Put every piece where it was after move number move; 0 resets the level"""
+        return self.apply_moves(self.history.jump(move))
+
+    def reset_level(self):
+        """Put every piece back where it was when the level started"""
+        return self.jump_to_move(0)
+
+    def apply_moves(self, changes):
+        """Move several pieces at once; returns whether anything moved"""
+        # Lift them all first, so a piece never lands on a cell another one is still leaving
+        for piece, _, _, _ in changes:
+            self.lift_piece(piece)
+        for piece, x, y, in_tray in changes:
+            piece.x, piece.y, piece.in_tray = x, y, in_tray
+        for piece, _, _, _ in changes:
+            self.drop_piece(piece)
+            self.update_piece_zone(piece)
+        if changes:
+            self.mark_all_dirty()
+            self.board_changed()
+        return bool(changes)
+
+    def board_changed(self):
+        """Drop the hint for the old board and, with hints on, ask for the new one"""
+        self.set_hint(None)
+        if self.show_hints:
+            self.request_hint()
+        else:
+            self.hints.cancel()
+
+    def request_hint(self):
+        """Show the hint for the current board, from the cache or once the background search finds it"""
+        if self.dragged_piece:
+            return  # The lifted piece is on neither the board nor the tray; asked again on the drop
+        tray = sorted(piece.piece_type for piece in self.tray_slots.values())
+        key = (self.hit_graph.key, tuple(tray))
+        self.set_hint(self.hints.request(key, tray, self.hit_graph.to_board))
+
+    def set_hint(self, hint):
+        for cell in (self.hint.cells if self.hint else []) + (hint.cells if hint else []):
+            self.mark_dirty(self.cell_rect(cell))
+        self.hint = hint
+
+    def move_piece(self, piece, x, y, in_tray=False):
+        """Move a piece to world position (x, y) on the board, or screen position (x, y) in the tray"""
+        self.lift_piece(piece)
+        piece.x, piece.y, piece.in_tray = x, y, in_tray
+        self.drop_piece(piece)
+        self.update_piece_zone(piece)
+
+    def lift_piece(self, piece):
+        """Take a piece off the board or out of the tray before it moves"""
+        if piece.in_tray:
+            slot = self.tray_slot_at(piece.x)
+            if self.tray_slots.get(slot) is piece:
+                del self.tray_slots[slot]
+            return
+        cell = pixel_to_cell(piece.x, piece.y)
+        self.board.remove_piece(cell, piece.piece_type)
+        if self.objects_at.get(cell) is piece:
+            self.hit_graph.remove_piece(cell)
+            del self.objects_at[cell]
+
+    def drop_piece(self, piece):
+        """Put a piece back on the board or in the tray at its current position"""
+        if piece.in_tray:
+            self.tray_slots[self.tray_slot_at(piece.x)] = piece
+            return
+        cell = pixel_to_cell(piece.x, piece.y)
+        self.board.add_piece(cell, piece.piece_type)
+        self.hit_graph.add_piece(cell, piece.piece_type)
+        if self.board.in_bounds(cell):
+            self.objects_at[cell] = piece
         
     def update_detonation_zones(self):
-        """Update the brightness of tiles based on all pieces' detonation zones"""
-        # Reset brightness
+        """Rebuild the brightness of every tile from all pieces' detonation zones"""
         self.detonation_brightness = {}
-        
-        # Calculate brightness for each piece
+        self.zone_cells = {}
         for piece in self.pieces:
-            # Only process pieces on the board (not in tray)
-            if piece.y < TRAY_Y:
-                # Convert piece position to grid coordinates using center
-                piece_center_x = piece.x + CELL_SIZE // 2
-                piece_center_y = piece.y + CELL_SIZE // 2
-                piece_grid_x = (piece_center_x - BOARD_X) // CELL_SIZE
-                piece_grid_y = (piece_center_y - BOARD_Y) // CELL_SIZE
-                    
-                # Get detonation zone for this piece
-                for dx, dy in piece.directions:
-                    # Calculate adjacent grid position
-                    grid_x = piece_grid_x + dx
-                    grid_y = piece_grid_y + dy
-                    
-                    # Check if within board bounds
-                    if 0 <= grid_x < BOARD_SIZE and 0 <= grid_y < BOARD_SIZE:
-                        key = (grid_x, grid_y)
-                        # Increment brightness for this tile
-                        self.detonation_brightness[key] = self.detonation_brightness.get(key, 0) + 1
+            self.update_piece_zone(piece)
+
+    def piece_zone_cell(self, piece):
+        """Board cell a piece lights the detonation zone of, or None in the tray or off the board"""
+        # Only pieces on the board (not in tray) have a zone
+        if not piece.in_tray:
+            cell = pixel_to_cell(piece.x, piece.y)
+            if self.board.in_bounds(cell):
+                return cell
+        return None
+
+    def update_piece_zone(self, piece):
+        """Move one piece's zone: subtract the old one and add the new one if its cell changed"""
+        cell = self.piece_zone_cell(piece)
+        old_cell = self.zone_cells.get(piece)
+        if cell == old_cell:
+            return
+        if old_cell is not None:
+            self.add_zone_brightness(piece, old_cell, -1)
+        if cell is not None:
+            self.add_zone_brightness(piece, cell, 1)
+        self.zone_cells[piece] = cell
+
+    def add_zone_brightness(self, piece, cell, amount):
+        """Add amount to the brightness of every tile in a piece's zone from cell"""
+        # Look up this piece's detonation zone
+        for key in self.board.zone_cells(cell, piece.piece_type):
+            brightness = self.detonation_brightness.get(key, 0) + amount
+            self.mark_dirty(self.cell_rect(key))
+            if brightness:
+                self.detonation_brightness[key] = brightness
+            else:
+                del self.detonation_brightness[key]
 
     def start_detonation(self):
         if not self.selected_piece:
             # If no piece selected, choose a random piece on the board
-            board_pieces = [p for p in self.pieces if p.y < TRAY_Y]  # Pieces on board have y < TRAY_Y
+            board_pieces = [p for p in self.pieces if not p.in_tray]
             if not board_pieces:
                 return
-            self.selected_piece = random.choice(board_pieces)
+            self.selected_piece = self.rng.choice(board_pieces)
             
-        self.detonation_sequence = [self.selected_piece]
+        self.mark_all_dirty()  # Selection glow may have moved
+        # The engine decides what fires and what is hit; the animation only plays that back
+        result = self.hit_graph.chain(self.piece_zone_cell(self.selected_piece))
+        # A piece off the board still fires, but its shots cannot land on anything
+        self.detonation_sequence = [self.objects_at[cell] for cell in result.firing_order] or [self.selected_piece]
+        self.detonation_targets = set(result.targets_hit)
         self.current_detonation_index = 0
         self.detonation_delay = 0
         self.projectiles = []
-        self.particles = []
+        self.particles.clear()
+        self.sim_clock.reset()
+        if self.instant_resolve:
+            self.resolve_detonation()
+        
+    def resolve_detonation(self):
+        """Run the current detonation to its end state without animating it"""
+        while self.detonation_sequence:
+            self.update_detonation()
+        self.projectiles = []
+        self.particles.clear()
+        self.mark_all_dirty()
         
     def update_detonation(self):
         if not self.detonation_sequence:
@@ -361,47 +582,36 @@ class Game:
         # Update projectiles
         for projectile in self.projectiles[:]:
             projectile.update()
-            print(f"Projectile at ({projectile.x}, {projectile.y}) with progress {projectile.progress}")
+            if PROJECTILE_TRACE.enabled("debug"):  # The arguments are properties, not free to compute
+                PROJECTILE_TRACE.debug("Projectile at (%s, %s) with progress %s", projectile.x, projectile.y, projectile.progress)
             if projectile.progress >= 1.0:  # Only remove when progress reaches 1.0
-                print("Projectile reached target")
+                PROJECTILE_TRACE.debug("Projectile reached target")
                 self.projectiles.remove(projectile)
                 
-                # Check if projectile hit a target
+                # Only targets in the resolved chain are hit, each by the first shot to land on it
                 target_hit = False
-                for target in self.targets[:]:  # Create a copy to safely remove items
+                landing = point_to_cell(*projectile.target_pos)
+                if landing in self.detonation_targets:
+                    self.detonation_targets.remove(landing)
+                    target = self.objects_at.pop(landing)
                     target_center_x = target.x + CELL_SIZE // 2
                     target_center_y = target.y + CELL_SIZE // 2
-                    if (abs(projectile.target_pos[0] - target_center_x) < CELL_SIZE // 2 and 
-                        abs(projectile.target_pos[1] - target_center_y) < CELL_SIZE // 2):
-                        # Target hit! Create special ring explosion
-                        # Create expanding rings
-                        for i in range(3):  # Create 3 concentric rings
-                            self.particles.append(Particle(self, target_center_x, target_center_y, 
-                                                         (255, 0, 0), is_ring=True, ring_radius=i * 10))
-                        # Add some regular particles for extra effect
-                        for _ in range(20):
-                            self.particles.append(Particle(self, target_center_x, target_center_y, (255, 0, 0)))
-                        self.targets.remove(target)  # Remove the hit target
-                        target_hit = True
-                        break
+                    # Target hit! Create special ring explosion
+                    # Create expanding rings
+                    self.particles.emit_rings(target_center_x, target_center_y, (255, 0, 0),
+                                              [i * 10 for i in range(3)])  # 3 concentric rings
+                    # Add some regular particles for extra effect
+                    self.particles.emit(target_center_x, target_center_y, (255, 0, 0), 20)
+                    self.targets.remove(target)  # Remove the hit target
+                    self.mark_dirty(self.cell_rect(landing).inflate(8, 8))
+                    self.board.remove_target(landing)
+                    self.hit_graph.remove_target(landing)
+                    target_hit = True
                 
                 if not target_hit:
-                    # Regular artillery explosion
-                    # Find the piece that launched this projectile
-                    for piece in self.detonation_sequence:
-                        if (piece.x + CELL_SIZE // 2 == projectile.start_pos[0] and 
-                            piece.y + CELL_SIZE // 2 == projectile.start_pos[1]):
-                            # Create 40 particles with the piece's color
-                            for _ in range(40):
-                                self.particles.append(Particle(self, projectile.target_pos[0], projectile.target_pos[1], piece.base_color))
-                            break
-                
-        # Update all particles
-        for particle in self.particles[:]:  # Create a copy of the list to safely remove items
-            particle.update()
-            if particle.is_dead():
-                print(f"Removing dead particle at ({particle.x}, {particle.y})")
-                self.particles.remove(particle)  # Remove from the original list
+                    # Regular artillery explosion: 40 particles in the launching piece's color
+                    self.particles.emit(projectile.target_pos[0], projectile.target_pos[1],
+                                        projectile.source.base_color, 40)
                 
         # Handle detonation timing
         if self.detonation_delay > 0:
@@ -409,8 +619,15 @@ class Game:
             return
             
         if self.current_detonation_index >= len(self.detonation_sequence):
+            if self.projectiles:
+                return  # Let the last shots land
             # Detonation sequence complete
             self.detonation_sequence = []
+            self.detonation_targets = set()
+            if not self.targets:
+                self.next_level()  # Level complete when all targets hit
+            else:
+                self.board_changed()  # Targets were hit
             return
             
         # Fire current piece
@@ -420,22 +637,36 @@ class Game:
         
         # Create projectiles only in the piece's firing directions
         for direction in piece.directions:
-            projectile = Projectile(self, center_x, center_y, direction)
+            projectile = Projectile(self, center_x, center_y, direction, source=piece)
             self.projectiles.append(projectile)
             
         # Move to next piece in sequence
         self.current_detonation_index += 1
-        self.detonation_delay = 50  # Increased from 15 to 50 frames to allow projectiles to complete trajectory
-        
-    def handle_events(self):
-        mouse_pos = pygame.mouse.get_pos()
+        self.detonation_delay = 50  # Increased from 15 to 50 steps to allow projectiles to complete trajectory
         
+    def handle_events(self, events, mouse_pos):
         # Update hover states
-        self.detonate_hover = self.detonate_button.collidepoint(mouse_pos)
-        self.undo_hover = self.undo_button.collidepoint(mouse_pos)
+        detonate_hover = self.detonate_button.collidepoint(mouse_pos)
+        undo_hover = self.undo_button.collidepoint(mouse_pos)
+        if detonate_hover != self.detonate_hover:
+            self.mark_dirty(self.detonate_button.inflate(BUTTON_SHADOW_OFFSET * 2, BUTTON_SHADOW_OFFSET * 2))
+        if undo_hover != self.undo_hover:
+            self.mark_dirty(self.undo_button.inflate(BUTTON_SHADOW_OFFSET * 2, BUTTON_SHADOW_OFFSET * 2))
+        self.detonate_hover = detonate_hover
+        self.undo_hover = undo_hover
         
-        for event in pygame.event.get():
+        pending_motion = None
+        for event in events:
+            if pending_motion and event.type != pygame.MOUSEMOTION:
+                # Apply coalesced motion before a click or release that depends on it
+                self.drag_to(pending_motion)
+                pending_motion = None
             if event.type == pygame.QUIT:
+                self.level_pool.close()
+                self.hints.close()
+                if self.recorder:
+                    self.recorder.close()
+                flush_trace()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -444,169 +675,363 @@ class Game:
                         self.start_detonation()  # Start detonation when button is clicked
                     elif self.undo_button.collidepoint(event.pos):
                         if self.undo_last_move():
-                            print("Undo successful")
-                            self.update_detonation_zones()  # Update zones after undo
+                            INPUT_TRACE.info("Undo successful")
+                            self.mark_all_dirty()
                         else:
-                            print("No moves to undo")
+                            INPUT_TRACE.info("No moves to undo")
                     else:
                         # Check if clicking on a piece
-                        for piece in self.pieces:
-                            piece_center_x = piece.x + CELL_SIZE // 2
-                            piece_center_y = piece.y + CELL_SIZE // 2
-                            # Check if click is within piece's radius
-                            if ((event.pos[0] - piece_center_x) ** 2 + 
-                                (event.pos[1] - piece_center_y) ** 2 <= 
-                                (CELL_SIZE // 2) ** 2):
-                                print(f"Mouse down on piece at ({piece.x}, {piece.y})")  # Debug print
-                                self.dragged_piece = piece
-                                self.drag_offset = (
-                                    event.pos[0] - piece_center_x,
-                                    event.pos[1] - piece_center_y
-                                )
-                                # Store initial position for potential move
-                                self.initial_drag_x = piece.x
-                                self.initial_drag_y = piece.y
-                                self.was_dragged = False  # Reset drag state
-                                break
+                        piece, (piece_center_x, piece_center_y) = self.piece_at(event.pos)
+                        if piece:
+                            INPUT_TRACE.debug("Mouse down on piece at (%s, %s)", piece.x, piece.y)
+                            self.dragged_piece = piece
+                            self.drag_offset = (
+                                event.pos[0] - piece_center_x,
+                                event.pos[1] - piece_center_y
+                            )
+                            # Store initial position for potential move
+                            self.initial_drag_x = piece.x
+                            self.initial_drag_y = piece.y
+                            self.initial_drag_in_tray = piece.in_tray
+                            self.was_dragged = False  # Reset drag state
+                            self.lift_piece(piece)
+                            self.mark_dirty(self.piece_rect(piece))  # Moves to the dynamic layer
                 elif event.button == 3:  # Right click for detonate
                     self.start_detonation()
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1 and self.dragged_piece:
-                    print(f"Mouse up on piece at ({self.dragged_piece.x}, {self.dragged_piece.y})")  # Debug print
+                    INPUT_TRACE.debug("Mouse up on piece at (%s, %s)", self.dragged_piece.x, self.dragged_piece.y)
                     if self.was_dragged:
-                        print("Piece was dragged")  # Debug print
+                        INPUT_TRACE.debug("Piece was dragged")
                         # Handle drag operation
                         if (self.dragged_piece.x != self.initial_drag_x or 
-                            self.dragged_piece.y != self.initial_drag_y):
+                            self.dragged_piece.y != self.initial_drag_y or
+                            self.dragged_piece.in_tray != self.initial_drag_in_tray):
                             
                             # Check if dropped in tray area
                             if TRAY_Y <= event.pos[1] < TRAY_Y + TRAY_HEIGHT:
                                 # Find first available position in tray
-                                new_x = BOARD_X
-                                new_y = TRAY_Y + (TRAY_HEIGHT - CELL_SIZE) // 2
-                                while True:
-                                    # Check if this position is valid
-                                    if self.is_valid_placement(new_x, new_y):
-                                        break
-                                    new_x += CELL_SIZE
-                                    # If we've checked all positions, return to original position
-                                    if new_x >= BOARD_X + BOARD_SIZE * CELL_SIZE:
-                                        new_x = self.initial_drag_x
-                                        new_y = self.initial_drag_y
-                                        break
+                                slot = self.free_tray_slot()
+                                if slot is not None:
+                                    new_x, new_y = self.tray_slot_pos(slot)
+                                    new_in_tray = True
+                                else:
+                                    # Tray is full, return to original position
+                                    new_x = self.initial_drag_x
+                                    new_y = self.initial_drag_y
+                                    new_in_tray = self.initial_drag_in_tray
                                 
                                 self.dragged_piece.x = new_x
                                 self.dragged_piece.y = new_y
+                                self.dragged_piece.in_tray = new_in_tray
                                 if self.selected_piece == self.dragged_piece:
                                     self.selected_piece = None
-                                self.save_move(self.dragged_piece, self.initial_drag_x, self.initial_drag_y, new_x, new_y)
+                                self.save_move(self.dragged_piece, self.initial_drag_x, self.initial_drag_y, new_x, new_y,
+                                               self.initial_drag_in_tray, new_in_tray)
                             else:
-                                # Calculate piece center based on mouse position and offset
-                                piece_center_x = event.pos[0] - self.drag_offset[0]
-                                piece_center_y = event.pos[1] - self.drag_offset[1]
-                                
-                                # Convert center to top-left for snapping
-                                piece_x = piece_center_x - CELL_SIZE // 2
-                                piece_y = piece_center_y - CELL_SIZE // 2
+                                # Calculate piece top-left in world coordinates from mouse position and offset
+                                piece_x, piece_y = self.drag_world_pos(event.pos)
                                 
                                 # Snap to grid
                                 grid_x, grid_y = self.snap_to_grid(piece_x, piece_y)
                                 
-                                if self.is_valid_placement(grid_x, grid_y):
+                                # Only drops inside the viewport land on the board
+                                if (self.camera.viewport.collidepoint(event.pos) and
+                                        self.is_valid_placement(grid_x, grid_y)):
                                     self.dragged_piece.x = grid_x
                                     self.dragged_piece.y = grid_y
-                                    self.save_move(self.dragged_piece, self.initial_drag_x, self.initial_drag_y, grid_x, grid_y)
+                                    self.dragged_piece.in_tray = False
+                                    self.save_move(self.dragged_piece, self.initial_drag_x, self.initial_drag_y, grid_x, grid_y,
+                                                   self.initial_drag_in_tray, False)
                                 else:
                                     # Return to original position if invalid
                                     self.dragged_piece.x = self.initial_drag_x
                                     self.dragged_piece.y = self.initial_drag_y
+                                    self.dragged_piece.in_tray = self.initial_drag_in_tray
                     else:
-                        print("Piece was clicked (not dragged)")  # Debug print
+                        INPUT_TRACE.debug("Piece was clicked (not dragged)")
                         # Handle selection
                         self.selected_piece = self.dragged_piece
                     
+                    self.drop_piece(self.dragged_piece)
+                    self.update_piece_zone(self.dragged_piece)  # Update zone after piece placement
+                    self.mark_all_dirty()  # Placement, tray and selection may all have changed
                     self.dragged_piece = None
-                    self.update_detonation_zones()  # Update zones after piece placement
+                    self.chain_preview = None
+                    self.preview_cell = None
+                    if self.show_hints and not self.hint:
+                        self.request_hint()  # Deferred while the piece was lifted
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    self.sim_clock.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.sim_clock.slower()
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                    self.mark_all_dirty()
+                elif event.key == pygame.K_F4:
+                    self.profiler.export(PROFILE_EXPORT_PATH)
+                    INPUT_TRACE.info("Frame profile written to %s", PROFILE_EXPORT_PATH)
+                elif event.key == pygame.K_s:
+                    # Toggle skip mode; turning it on also finishes a running detonation
+                    self.instant_resolve = not self.instant_resolve
+                    if self.instant_resolve:
+                        self.resolve_detonation()
+                elif event.key == pygame.K_h:
+                    # Toggle hints; while on, every board change restarts the search
+                    self.show_hints = not self.show_hints
+                    self.board_changed()
+                elif event.key in HISTORY_KEYS and not self.dragged_piece:
+                    if getattr(self, HISTORY_KEYS[event.key])():
+                        INPUT_TRACE.info("%s successful", HISTORY_KEYS[event.key])
+                elif event.key in SCROLL_KEYS:
+                    if self.camera.scroll(*SCROLL_KEYS[event.key]):
+                        self.camera_moved()
+            elif event.type == pygame.MOUSEWHEEL:
+                # Zoom around the mouse when it is over the board
+                anchor = mouse_pos if self.camera.viewport.collidepoint(mouse_pos) else None
+                if self.camera.zoom(event.y, anchor):
+                    self.camera_moved()
             elif event.type == pygame.MOUSEMOTION:
                 if self.dragged_piece:
-                    # Update piece center position while dragging
-                    piece_center_x = event.pos[0] - self.drag_offset[0]
-                    piece_center_y = event.pos[1] - self.drag_offset[1]
-                    
-                    # Convert center to top-left for drawing
-                    self.dragged_piece.x = piece_center_x - CELL_SIZE // 2
-                    self.dragged_piece.y = piece_center_y - CELL_SIZE // 2
-                    self.was_dragged = True  # Mark that the piece was actually moved
-                    self.update_detonation_zones()  # Update zones while dragging
-        
-    def update(self):
-        self.handle_events()
+                    # Coalesce motion: only the latest position this frame matters
+                    pending_motion = event.pos
+        
+        if pending_motion:
+            self.drag_to(pending_motion)
+        
+    def piece_at(self, pos):
+        """The piece under a screen position and its screen center, or (None, (None, None))"""
+        # Only the piece on the cell or tray slot under the mouse can contain it
+        piece = None
+        if self.camera.viewport.collidepoint(pos):
+            piece = self.objects_at.get(self.camera.screen_to_cell(pos))
+            if not isinstance(piece, ArtilleryPiece):
+                piece = None
+        elif TRAY_Y <= pos[1] < TRAY_Y + TRAY_HEIGHT:
+            piece = self.tray_slots.get(self.tray_slot_at(pos[0]))
+        if piece is None:
+            return None, (None, None)
+        (x, y), cell_size = self.piece_screen_pos(piece)
+        piece_center_x = x + cell_size // 2
+        piece_center_y = y + cell_size // 2
+        # Check if click is within piece's radius
+        if ((pos[0] - piece_center_x) ** 2 + 
+            (pos[1] - piece_center_y) ** 2 <= 
+            (cell_size // 2) ** 2):
+            return piece, (piece_center_x, piece_center_y)
+        return None, (None, None)
+
+    def drag_world_pos(self, pos):
+        """World top-left of the dragged piece when the mouse is at screen position pos"""
+        half = self.camera.cell_size // 2
+        x, y = self.camera.to_world(pos[0] - self.drag_offset[0] - half, pos[1] - self.drag_offset[1] - half)
+        return round(x), round(y)
+
+    def drag_to(self, pos):
+        """Move the dragged piece to follow the mouse"""
+        if self.camera.viewport.collidepoint(pos):
+            # Over the board the piece lives in world coordinates and shows its zone
+            self.dragged_piece.x, self.dragged_piece.y = self.drag_world_pos(pos)
+            self.dragged_piece.in_tray = False
+        else:
+            # Update piece center position while dragging
+            piece_center_x = pos[0] - self.drag_offset[0]
+            piece_center_y = pos[1] - self.drag_offset[1]
+            
+            # Convert center to top-left for drawing
+            self.dragged_piece.x = piece_center_x - CELL_SIZE // 2
+            self.dragged_piece.y = piece_center_y - CELL_SIZE // 2
+            self.dragged_piece.in_tray = True
+        self.was_dragged = True  # Mark that the piece was actually moved
+        self.update_piece_zone(self.dragged_piece)  # Only changes when the hovered cell does
+        self.update_chain_preview()
+        
+    def update(self, dt=STEP, events=None, mouse_pos=None):
+        """Handle input, then advance the simulation by dt seconds of real time.
+
+        Input is read from pygame unless events and mouse_pos are given, as a replay does.
+        """
+        if events is None:
+            mouse_pos = pygame.mouse.get_pos()
+            events = pygame.event.get()
+        if self.recorder:
+            self.recorder.record(self, dt, mouse_pos, events)
+        self.handle_events(events, mouse_pos)
+        if self.hints.running:
+            hint = self.hints.poll()
+            if hint:
+                INPUT_TRACE.info("Hint: %s", hint)
+                self.set_hint(hint)
+        self.profiler.lap("events")
+        for _ in range(self.sim_clock.advance(dt)):
+            self.step_simulation()
+            
+    def step_simulation(self):
+        """One fixed simulation step"""
         self.update_detonation()
+        self.profiler.lap("detonation")
         
         # Update and remove dead particles
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_dead():
-                print(f"Removing dead particle at ({particle.x}, {particle.y})")
-                self.particles.remove(particle)
+        self.particles.update()
+        self.profiler.lap("particles")
     
-    def draw(self):
-        self.screen.fill(WHITE)
-        self.draw_header()
-        self.draw_board()
-        self.draw_tray()
-        
-        # Draw all pieces
-        for piece in self.pieces:
-            piece.draw(self.screen)
+    def state_hash(self):
+        """Short digest of the game state, compared at replay checkpoints"""
+        state = (
+            self.level.number, self.score,
+            [(piece.x, piece.y, piece.in_tray, piece.piece_type) for piece in self.pieces],
+            [(target.x, target.y) for target in self.targets],
+            [(monolith.x, monolith.y) for monolith in self.monoliths],
+            self.current_detonation_index, self.detonation_delay, len(self.detonation_sequence),
+            [(projectile.x, projectile.y, projectile.progress) for projectile in self.projectiles],
+            self.sim_clock.steps
+        )
+        digest = hashlib.blake2b(repr(state).encode(), digest_size=8)
+        live = slice(0, len(self.particles))
+        digest.update(self.particles.arrays['x'][live].tobytes())
+        digest.update(self.particles.arrays['y'][live].tobytes())
+        return digest.hexdigest()
+
+    def draw_static_layer(self, surface):
+        """Background, header frame, board, grid and tray: never change during play"""
+        surface.fill(WHITE)
+        self.draw_header(surface)
+        self.draw_board(surface)
+        self.draw_tray(surface)
+
+    def draw_scene_layer(self, surface):
+        """Buttons, score, zones and resting pieces: change only on moves, hovers and hits"""
+        self.draw_buttons(surface)
+        self.draw_score(surface)
         
-        # Draw targets
-        for target in self.targets:
-            target.draw(self.screen)
+        # Board contents are clipped to the viewport and culled to the cells under the clip
+        clip = surface.get_clip()
+        board_clip = clip.clip(self.camera.viewport)
+        surface.set_clip(board_clip)
+        self.draw_zones(surface)
+        self.draw_selection(surface)
+        self.draw_chain_preview(surface)
+        self.draw_hint(surface)
         
-        # Draw monoliths
-        for monolith in self.monoliths:
-            monolith.draw(self.screen)
+        # Draw pieces, targets and monoliths in view, except the piece following the mouse
+        cell_size = self.camera.cell_size
+        for cell, obj in self.camera.visible_items(self.objects_at, board_clip):
+            if obj is not self.dragged_piece:
+                obj.draw(surface, self.camera.cell_rect(cell).topleft, cell_size)
+        surface.set_clip(clip)
         
-        # Draw projectiles and particles
-        for projectile in self.projectiles:
-            projectile.draw(self.screen)
+        # Draw the pieces waiting in the tray
+        for piece in self.tray_slots.values():
+            if piece is not self.dragged_piece:
+                piece.draw(surface)
+
+    def draw_dynamic_layer(self, surface):
+        """Dragged piece, projectiles and particles: change every frame"""
+        # Draw projectiles and particles between the last two simulation steps, culled to the clip
+        clip = surface.get_clip()
+        board_clip = clip.clip(self.camera.viewport)
+        surface.set_clip(board_clip)
+        blend = self.sim_clock.blend
+        projectiles = [projectile for projectile, rect in self.projectile_rects if rect.colliderect(board_clip)]
+        TRAILS.draw(surface, projectiles, self.camera)
+        for projectile in projectiles:
+            projectile.draw(surface, blend, self.camera)
             
-        for particle in self.particles:
-            particle.draw(self.screen)
+        self.particles.draw(surface, blend, self.camera, board_clip)
+        surface.set_clip(clip)
         
-        # Update and draw detonation zones for moving piece
         if self.dragged_piece:
-            # Use exact same logic as snap_to_grid
-            center_x = self.dragged_piece.x + CELL_SIZE // 2
-            center_y = self.dragged_piece.y + CELL_SIZE // 2
-            
-            # Get current cell
-            current_cell_x = (center_x - BOARD_X) // CELL_SIZE
-            current_cell_y = (center_y - BOARD_Y) // CELL_SIZE
-            
-            # Snap center to nearest grid cell center
-            grid_center_x = current_cell_x * CELL_SIZE + BOARD_X + CELL_SIZE // 2
-            grid_center_y = current_cell_y * CELL_SIZE + BOARD_Y + CELL_SIZE // 2
-            
-            # Convert back to top-left coordinates
-            snapped_x = grid_center_x - CELL_SIZE // 2
-            snapped_y = grid_center_y - CELL_SIZE // 2
-            
-            # Temporarily move piece to snapped position for zone drawing
-            original_x, original_y = self.dragged_piece.x, self.dragged_piece.y
-            self.dragged_piece.x, self.dragged_piece.y = snapped_x, snapped_y
-            self.update_detonation_zones()
-            self.dragged_piece.x, self.dragged_piece.y = original_x, original_y
+            self.dragged_piece.draw(surface, *self.piece_screen_pos(self.dragged_piece))
         
-        pygame.display.flip()
+        if self.profiler.overlay:
+            self.profiler.draw_overlay(surface, BOARD_X, BOARD_Y)
+
+    def update_scene_layer(self, rects=None):
+        """Rebuild the cached scene layer on top of the static layer, only inside rects if given"""
+        for clip in merge_rects(rects) if rects else [self.scene_layer.get_rect()]:
+            self.scene_layer.set_clip(clip)
+            self.scene_layer.blit(self.static_layer, clip, clip)
+            self.draw_scene_layer(self.scene_layer)
+        self.scene_layer.set_clip(None)
+
+    def draw_scene(self, surface):
+        """Composite the cached layers and the dynamic objects onto surface"""
+        clip = surface.get_clip()
+        surface.blit(self.scene_layer, clip, clip)
+        self.draw_dynamic_layer(surface)
+
+    def dynamic_rects(self):
+        """Screen regions of everything that moves on its own: dragged piece, projectiles, particles"""
+        # Effects are clipped to the viewport; those scrolled out of view are left out entirely
+        viewport = self.camera.viewport
+        rects = [rect.clip(viewport) for _, rect in self.projectile_rects]
+        particles_rect = self.particles.bounding_rect(self.camera)
+        if particles_rect:
+            rects.append(particles_rect.clip(viewport))
+        rects = [rect for rect in rects if rect]
+        if self.dragged_piece:
+            rects.append(self.piece_rect(self.dragged_piece))
+        if self.profiler.overlay:
+            rects.append(self.profiler.overlay_rect(BOARD_X, BOARD_Y))
+        return rects
+    
+    def draw(self):
+        if self.static_dirty:
+            self.draw_static_layer(self.static_layer)
+            self.static_dirty = False
+        if self.full_redraw:
+            self.update_scene_layer()
+        elif self.dirty_rects:
+            self.update_scene_layer(self.dirty_rects)
+        self.profiler.lap("scene_layer")
+        self.projectile_rects = [(projectile, projectile.bounding_rect(self.camera)) for projectile in self.projectiles]
+        dynamic_rects = self.dynamic_rects()
+
+        if not DIRTY_RECT_RENDERING or self.full_redraw:
+            self.draw_scene(self.screen)
+            self.profiler.lap("composite")
+            pygame.display.flip()
+            self.profiler.lap("present")
+            self.full_redraw = False
+            self.dirty_rects = []
+            self.last_dynamic_rects = dynamic_rects
+            return
+
+        # Redraw where things changed, plus where moving objects were and now are
+        rects = self.dirty_rects
+        # Interpolation, fading and overlay text change what moving objects look like even when their bounds do not
+        if (dynamic_rects != self.last_dynamic_rects or self.projectiles or self.particles
+                or self.profiler.overlay):
+            rects += self.last_dynamic_rects + dynamic_rects
+        self.dirty_rects = []
+        self.last_dynamic_rects = dynamic_rects
+        if not rects:
+            return  # Idle frame: nothing to draw or push to the display
+
+        # Each separate region is redrawn on its own, drawing only what lies under it
+        rects = merge_rects(rects)
+        for clip in rects:
+            self.screen.set_clip(clip)
+            self.draw_scene(self.screen)
+        self.screen.set_clip(None)
+        self.profiler.lap("composite")
+        pygame.display.update(rects)
+        self.profiler.lap("present")
     
     def run(self):
         while True:
-            self.update()
+            # Frame time drives the simulation clock; rendering stays capped at 60 FPS
+            dt = self.clock.tick(60) / 1000
+            self.profiler.start_frame()
+            self.update(dt)
             self.draw()
-            self.clock.tick(60)
+            self.profiler.end_frame()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Artillery puzzle game")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--board-size", type=int, help="play a generated stress board of this many cells per side")
+    args = parser.parse_args()
+    game = Game(args.level, board_size=args.board_size)
     game.run() 
\ No newline at end of file
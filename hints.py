@@ -0,0 +1,183 @@
+"""Hints computed in a background process.
+
+A hint is either the next tray piece to place and where, or the best piece
+to fire first when the tray is empty or the tray cannot clear the level.
+Searches run in one long-lived worker process, so they never compete with
+the 60 FPS loop for the GIL. Every request bumps a generation counter that
+the worker shares: a search whose generation is no longer current stops at
+its next check and its answer, if any, is dropped, so a move never waits on
+killing or starting a process. Complete answers are cached per board state,
+so asking again about a board already seen returns at once.
+"""
+import multiprocessing
+import queue
+from collections import OrderedDict
+from config import BOARD_SIZE, HINT_CACHE_SIZE, HINT_MAX_NODES
+from engine import resolve_chain
+from solver import Solver
+
+CANCEL_CHECK_PIECES = 64  # Pieces scored by best_start between cancellation checks
+
+
+class Hint:
+    """Suggested next step: a tray piece placement, or the piece to fire first"""
+
+    def __init__(self, start=None, placement=None, clears=False, complete=True):
+        self.start = start  # Cell of the piece to fire first
+        self.placement = placement  # (cell, piece_type) to place next, or None
+        self.clears = clears  # Whether following the hint can hit every target
+        self.complete = complete  # False if the tray was not fully searched, so a better hint may exist
+
+    @property
+    def cells(self):
+        """Cells to highlight on the board"""
+        cells = [self.placement[0]] if self.placement else []
+        if self.start is not None and self.start not in cells:
+            cells.append(self.start)
+        return cells
+
+    def __repr__(self):
+        return (f"Hint(start={self.start}, placement={self.placement}, clears={self.clears}, "
+                f"complete={self.complete})")
+
+
+def best_start(board, cancelled=None):
+    """Hint for the placed piece whose chain hits the most targets and the fewest monoliths"""
+    best = None
+    best_score = None
+    for number, cell in enumerate(board.pieces):
+        if cancelled is not None and number % CANCEL_CHECK_PIECES == 0 and cancelled():
+            return None
+        result = resolve_chain(board, cell)
+        score = (len(result.targets_hit), -len(result.monoliths_hit))
+        if best_score is None or score > best_score:
+            best, best_score = Hint(cell, clears=result.all_targets_hit and not result.monoliths_hit), score
+    return best or Hint()
+
+
+def find_hint(board, tray, max_nodes=HINT_MAX_NODES, cancelled=None):
+    """Search for a hint, or return None if cancelled() turned True.
+
+    The solver only handles standard-size boards; elsewhere the hint ignores
+    the tray and is marked incomplete.
+    """
+    complete = not tray
+    if tray and board.size == BOARD_SIZE:
+        solver = Solver(board, tray, max_nodes=max_nodes, cancelled=cancelled)
+        solution = solver.solve()
+        if solver.stopped:
+            return None
+        if solution:
+            placement = solution.placements[0] if solution.placements else None
+            return Hint(solution.start, placement, clears=True)
+        complete = not solver.gave_up
+    hint = best_start(board, cancelled)
+    if hint is not None:
+        hint.complete = complete
+    return hint
+
+
+def hint_worker(requests, results, generation):
+    """Worker process loop: answer the newest request, skipping any that went stale"""
+    while True:
+        request = requests.get()
+        # Only the newest request matters
+        while request is not None:
+            try:
+                request = requests.get_nowait()
+            except queue.Empty:
+                break
+        if request is None:
+            return
+        number, board, tray = request
+        if generation.value != number:
+            continue
+        hint = find_hint(board, tray, cancelled=lambda: generation.value != number)
+        if hint is not None:
+            results.put((number, hint))
+
+
+class HintService:
+    """Feeds hint requests to the worker and caches the complete answers.
+
+    Callers identify a board state by a hashable key they keep up to date
+    themselves, so a request for a cached state costs a dict lookup.
+    """
+
+    def __init__(self, cache_size=HINT_CACHE_SIZE):
+        self.cache = OrderedDict()  # Board state key -> Hint, least recently used first
+        self.cache_size = cache_size
+        self.process = None  # Worker, started on the first search
+        self.requests = None
+        self.results = None
+        self.generation = None  # Shared with the worker
+        self.number = 0  # Generation of the newest request
+        self.pending_key = None  # Board state key of the search in progress
+
+    @property
+    def running(self):
+        return self.pending_key is not None
+
+    def start(self):
+        self.requests = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.generation = multiprocessing.Value("q", self.number, lock=False)
+        self.process = multiprocessing.Process(target=hint_worker, args=(self.requests, self.results, self.generation),
+                                               daemon=True)
+        self.process.start()
+
+    def request(self, key, tray, make_board):
+        """Return the cached hint for board state key, or start searching and return None.
+
+        make_board() builds the Board to search and is only called on a cache miss.
+        """
+        if key == self.pending_key:
+            return None
+        hint = self.cache.get(key)
+        if hint is not None:
+            self.cancel()
+            self.cache.move_to_end(key)
+            return hint
+        if self.process is None or not self.process.is_alive():
+            self.start()
+        self.cancel()
+        self.pending_key = key
+        self.requests.put((self.number, make_board(), list(tray)))
+        return None
+
+    def poll(self):
+        """Return the hint once the current search has finished, otherwise None"""
+        if not self.running:
+            return None
+        while True:
+            try:
+                number, hint = self.results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self.pending_key = None  # Worker died; the next request restarts it
+                return None
+            if number == self.number:
+                break  # Anything older answers a board that is gone
+        if hint.complete:
+            self.cache[self.pending_key] = hint
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.pending_key = None
+        return hint
+
+    def cancel(self):
+        """Abandon the search in progress; the worker notices at its next check"""
+        self.number += 1
+        if self.generation is not None:
+            self.generation.value = self.number
+        self.pending_key = None
+
+    def close(self):
+        if self.process is None:
+            return
+        self.cancel()
+        self.requests.put(None)
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
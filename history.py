@@ -0,0 +1,130 @@
+"""Compact undo/redo history of piece moves.
+
+Each move is stored as a small tuple of ints: the piece's index in the
+level's piece list and its old and new (x, y, in_tray) position. Every
+snapshot_interval moves the positions of all pieces are also stored as a
+flat int array. Any retained point in the history is then at most
+snapshot_interval deltas from a snapshot (or from the current state), so
+jumping there costs the same however long the session has been. Only the
+last max_moves moves are kept; older ones are dropped a snapshot interval
+at a time, but the level start snapshot is always kept so the board can
+be reset.
+"""
+from array import array
+from config import HISTORY_SNAPSHOT_INTERVAL, HISTORY_MAX_MOVES
+
+
+def snapshot(pieces):
+    """Positions of all pieces as a flat [x, y, in_tray, ...] int array"""
+    positions = array("i")
+    for piece in pieces:
+        positions.extend((piece.x, piece.y, piece.in_tray))
+    return positions
+
+
+class MoveHistory:
+    """Undo, redo and jump over the moves made on one level.
+
+    Moves are numbered from 0 (level start); position is the number of the
+    move the board currently reflects. Methods that change position return
+    the [(piece, x, y, in_tray)] changes for Game to apply.
+    """
+
+    def __init__(self, pieces, snapshot_interval=HISTORY_SNAPSHOT_INTERVAL, max_moves=HISTORY_MAX_MOVES):
+        self.pieces = pieces
+        self.index = {piece: i for i, piece in enumerate(pieces)}
+        self.snapshot_interval = snapshot_interval
+        self.max_moves = max(max_moves, snapshot_interval)
+        self.start = snapshot(pieces)
+        self.clear()
+
+    def clear(self):
+        """Forget every move, keeping the level start"""
+        self.first = 0  # Number of the oldest retained move state
+        self.deltas = []  # deltas[i] leads from state first + i to first + i + 1
+        self.snapshots = [self.start]  # snapshots[i] is state first + i * snapshot_interval
+        self.position = 0
+
+    @property
+    def last(self):
+        return self.first + len(self.deltas)
+
+    @property
+    def can_undo(self):
+        return self.position > self.first
+
+    @property
+    def can_redo(self):
+        return self.position < self.last
+
+    def record(self, piece, old, new):
+        """Add a move from old to new (x, y, in_tray), dropping any redo branch"""
+        offset = self.position - self.first
+        del self.deltas[offset:]
+        del self.snapshots[offset // self.snapshot_interval + 1:]
+        self.deltas.append((self.index[piece], *old, *new))
+        self.position += 1
+        if (self.position - self.first) % self.snapshot_interval == 0:
+            self.snapshots.append(snapshot(self.pieces))
+        if len(self.deltas) > self.max_moves:
+            # Forget the oldest snapshot interval of moves
+            del self.deltas[:self.snapshot_interval]
+            del self.snapshots[0]
+            self.first += self.snapshot_interval
+
+    def undo(self):
+        if not self.can_undo:
+            return []
+        self.position -= 1
+        index, old_x, old_y, old_in_tray, *_ = self.deltas[self.position - self.first]
+        return [(self.pieces[index], old_x, old_y, bool(old_in_tray))]
+
+    def redo(self):
+        if not self.can_redo:
+            return []
+        index, _, _, _, new_x, new_y, new_in_tray = self.deltas[self.position - self.first]
+        self.position += 1
+        return [(self.pieces[index], new_x, new_y, bool(new_in_tray))]
+
+    def jump(self, move):
+        """Go straight to move number move; 0 is always the level start.
+
+        Returns the changes for every piece whose position differs, each
+        piece at most once.
+        """
+        if move == 0 and self.first > 0:
+            # The moves leading away from the start are gone, so there is no redo from here
+            positions = self.start
+            self.clear()
+            return self.changes(positions)
+        if not self.first <= move <= self.last:
+            raise ValueError(f"Move {move} is not in the history ({self.first}-{self.last})")
+
+        if abs(move - self.position) <= self.snapshot_interval:
+            # Close by: step through the deltas, keeping each piece's final position
+            changes = {}
+            while self.position > move:
+                piece, *position = self.undo()[0]
+                changes[piece] = position
+            while self.position < move:
+                piece, *position = self.redo()[0]
+                changes[piece] = position
+            return [(piece, *position) for piece, position in changes.items()]
+
+        # Far away: start from the nearest snapshot at or before move
+        base = (move - self.first) // self.snapshot_interval
+        positions = array("i", self.snapshots[base])
+        for delta in self.deltas[base * self.snapshot_interval:move - self.first]:
+            index = delta[0]
+            positions[index * 3:index * 3 + 3] = array("i", delta[4:])
+        self.position = move
+        return self.changes(positions)
+
+    def changes(self, positions):
+        """Changes that bring every piece to its position in a snapshot array"""
+        changes = []
+        for i, piece in enumerate(self.pieces):
+            x, y, in_tray = positions[i * 3:i * 3 + 3]
+            if (piece.x, piece.y, piece.in_tray) != (x, y, in_tray):
+                changes.append((piece, x, y, bool(in_tray)))
+        return changes
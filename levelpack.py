@@ -0,0 +1,150 @@
+"""Compact binary level packs.
+
+A pack is a 12-byte header followed by fixed-size 40-byte records, one per
+level. The reader memory-maps the file, so level i is one struct unpack at a
+known offset and opening a pack of any size costs the same.
+
+Header: magic b"VBLP", version (u16), record size (u16), record count (u32)
+Record: targets mask (u64), monoliths mask (u64), seed (u64), level number
+        (u16), tray count (u8), tray types (u8 bitmask, bit i set = slot i is
+        diagonal), solution types (u8 bitmask), solution cells (8 x u8 cell
+        index, first fires first), 3 bytes padding
+
+Usage: python levelpack.py build out.pack [--levels 30] [--count 100] [--seed 0]
+       python levelpack.py info out.pack
+"""
+import argparse
+import mmap
+import struct
+from config import BOARD_SIZE, HORIZONTAL, DIAGONAL, MAX_LEVEL_PIECES
+from bitboard import NUM_CELLS, cell_index, cells_mask, index_cell, mask_cells
+from levels import Level, generate_level
+
+MAGIC = b"VBLP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct(f"<QQQHBBB{MAX_LEVEL_PIECES}s3x")
+UNUSED_CELL = 0xFF
+
+# Masks are stored as u64, so packs only cover boards up to 8x8
+assert NUM_CELLS <= 64
+
+
+def _types_mask(piece_types):
+    mask = 0
+    for slot, piece_type in enumerate(piece_types):
+        if piece_type == DIAGONAL:
+            mask |= 1 << slot
+    return mask
+
+
+def _mask_types(mask, count):
+    return [DIAGONAL if mask & (1 << slot) else HORIZONTAL for slot in range(count)]
+
+
+def pack_level(level):
+    """Encode a Level as one fixed-size record"""
+    if level.size != BOARD_SIZE or level.placed:
+        raise ValueError("Level packs only hold campaign levels on the standard board")
+    solution_cells = bytes(cell_index(cell) for cell, _ in level.solution)
+    return RECORD.pack(
+        cells_mask(level.targets),
+        cells_mask(level.monoliths),
+        level.seed,
+        level.number,
+        len(level.tray),
+        _types_mask(level.tray),
+        _types_mask([piece_type for _, piece_type in level.solution]),
+        solution_cells.ljust(MAX_LEVEL_PIECES, bytes([UNUSED_CELL]))
+    )
+
+
+def unpack_level(record):
+    """Decode one record back into a Level"""
+    (targets, monoliths, seed, number, tray_count, tray_types,
+     solution_types, solution_cells) = RECORD.unpack(record)
+    cells = [index_cell(index) for index in solution_cells if index != UNUSED_CELL]
+    solution = list(zip(cells, _mask_types(solution_types, len(cells))))
+    return Level(number, seed, mask_cells(targets), mask_cells(monoliths),
+                 _mask_types(tray_types, tray_count), solution)
+
+
+def write_pack(path, levels):
+    """Write levels to a pack file; returns the number of records written"""
+    levels = list(levels)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(levels)))
+        for level in levels:
+            f.write(pack_level(level))
+    return len(levels)
+
+
+class LevelPack:
+    """Random access to the levels of a memory-mapped pack file"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} level pack")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("level pack index out of range")
+        offset = HEADER.size + index * RECORD.size
+        return unpack_level(self.data[offset:offset + RECORD.size])
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def create_objects(self, index, game):
+        """Build the ArtilleryPiece/Target/Monolith objects Game uses for level index"""
+        # Imported here so headless tools can read packs without pygame
+        from pieces import create_level_objects
+        return create_level_objects(game, self[index])
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect binary level packs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="generate levels into a pack")
+    build.add_argument("path")
+    build.add_argument("--levels", type=int, default=30, help="highest level number")
+    build.add_argument("--count", type=int, default=100, help="levels per level number")
+    build.add_argument("--seed", type=int, default=0, help="first seed")
+    info = subparsers.add_parser("info", help="summarize a pack")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        levels = (generate_level(number, args.seed + offset)
+                  for number in range(1, args.levels + 1) for offset in range(args.count))
+        count = write_pack(args.path, levels)
+        print(f"wrote {count} levels ({HEADER.size + count * RECORD.size} bytes) to {args.path}")
+    else:
+        with LevelPack(args.path) as pack:
+            numbers = [level.number for level in pack]
+            print(f"{len(pack)} levels, numbers {min(numbers, default=0)}-{max(numbers, default=0)}, "
+                  f"{RECORD.size} bytes per level")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Procedural level generation following the game spec.
+
+Levels are built on bitboards by growing the solution: the first piece goes
+anywhere except the edges, every further piece goes in the detonation zone of
+the pieces already placed, targets go in zone tiles that are still free and
+monoliths go outside every solution zone. The solution pieces are then moved
+to the tray. When a layout paints itself into a corner the attempt is thrown
+away and retried, and the retry count is kept for benchmarking.
+"""
+import random
+from config import (BOARD_SIZE, HORIZONTAL, DIAGONAL, MAX_LEVEL_PIECES,
+                    MAX_LEVEL_TARGETS, MAX_LEVEL_MONOLITHS, STRESS_DENSITY, STRESS_TRAY_PIECES)
+from engine import Board
+from bitboard import ATTACKS, FULL_MASK, cell_bit, cell_index, index_cell, iter_bits
+
+# Bumped whenever the same (number, seed) starts producing a different level
+GENERATOR_VERSION = 2
+
+# Cells a first piece may use: anywhere except the edges
+INTERIOR = sum(cell_bit((col, row))
+               for col in range(1, BOARD_SIZE - 1) for row in range(1, BOARD_SIZE - 1))
+
+
+class Level:
+    """A generated level: fixed board contents, tray pieces and the known solution"""
+
+    def __init__(self, number, seed, targets, monoliths, tray, solution, retries=0,
+                 size=BOARD_SIZE, placed=()):
+        self.number = number
+        self.seed = seed
+        self.targets = targets  # [(col, row)]
+        self.monoliths = monoliths  # [(col, row)]
+        self.tray = tray  # Piece types in tray order
+        self.solution = solution  # [(cell, piece_type)], first entry fires first
+        self.retries = retries  # Rejected attempts before this layout was accepted
+        self.size = size  # Board width and height in cells
+        self.placed = list(placed)  # [(cell, piece_type)] already on the board at the start
+
+    @property
+    def board(self):
+        """The board as the player first sees it, with every piece still in the tray"""
+        return Board(dict(self.placed), self.targets, self.monoliths, self.size)
+
+    @property
+    def solution_board(self):
+        return Board(dict(self.placed + self.solution), self.targets, self.monoliths, self.size)
+
+    @property
+    def start(self):
+        return self.solution[0][0]
+
+    def to_dict(self):
+        return {
+            'number': self.number,
+            'seed': self.seed,
+            'targets': self.targets,
+            'monoliths': self.monoliths,
+            'tray': self.tray,
+            'solution': self.solution,
+            'retries': self.retries,
+            'size': self.size,
+            'placed': self.placed
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['number'],
+            data['seed'],
+            [tuple(cell) for cell in data['targets']],
+            [tuple(cell) for cell in data['monoliths']],
+            list(data['tray']),
+            [(tuple(cell), piece_type) for cell, piece_type in data['solution']],
+            data.get('retries', 0),
+            data.get('size', BOARD_SIZE),
+            [(tuple(cell), piece_type) for cell, piece_type in data.get('placed', ())]
+        )
+
+    def __repr__(self):
+        return (f"Level(number={self.number}, seed={self.seed}, targets={self.targets}, "
+                f"monoliths={self.monoliths}, tray={self.tray})")
+
+
+def piece_count(number):
+    if number <= 2:
+        return 1
+    return min(MAX_LEVEL_PIECES, 2 + (number - 2) // 2)
+
+
+def target_count(number):
+    if number <= 2:
+        return number
+    # Each piece may only have one target in its zone, so never more targets than pieces
+    return min(MAX_LEVEL_TARGETS, 3 + (number - 2) // 5, piece_count(number))
+
+
+def monolith_count(number):
+    return min(MAX_LEVEL_MONOLITHS, 1 + number // 4)
+
+
+def _random_cell(rnd, mask):
+    """Index of a random set bit in mask"""
+    return rnd.choice(list(iter_bits(mask)))
+
+
+def _place_monoliths(rnd, number, blocked):
+    """Monoliths go on tiles outside the solution's zones, pieces and targets"""
+    free = list(iter_bits(~blocked & FULL_MASK))
+    count = min(monolith_count(number), len(free))
+    return [index_cell(index) for index in sorted(rnd.sample(free, count))]
+
+
+def _level_one(rnd):
+    center = (BOARD_SIZE - 1) // 2
+    target = (center, center)
+    dx, dy = rnd.choice([(0, -1), (1, 0), (0, 1), (-1, 0)])
+    piece = (center + dx, center + dy)
+    return [(piece, HORIZONTAL)], [target]
+
+
+def _level_two(rnd):
+    center = (BOARD_SIZE - 1) // 2
+    side = rnd.choice((-1, 1))
+    if rnd.random() < 0.5:
+        # Targets one space apart horizontally, piece diagonally between them
+        targets = [(center - 1, center), (center + 1, center)]
+        piece = (center, center + side)
+    else:
+        targets = [(center, center - 1), (center, center + 1)]
+        piece = (center + side, center)
+    return [(piece, DIAGONAL)], targets
+
+
+def _grow_solution(rnd, number):
+    """One attempt at a level 3+ layout; returns (solution, targets) or None"""
+    types = [rnd.choice((HORIZONTAL, DIAGONAL)) for _ in range(piece_count(number))]
+
+    # First piece anywhere except the edges, the rest inside the existing zones
+    solution = []
+    pieces = 0
+    zone = 0
+    for piece_type in types:
+        candidates = INTERIOR if not solution else zone & ~pieces
+        if not candidates:
+            return None
+        index = _random_cell(rnd, candidates)
+        solution.append((index, piece_type))
+        pieces |= 1 << index
+        zone |= ATTACKS[piece_type][index]
+
+    # Targets on free zone tiles, never a second target in any piece's zone
+    targets = 0
+    covered = 0  # Zones of pieces that already have their target
+    for _ in range(target_count(number)):
+        candidates = zone & ~pieces & ~targets & ~covered
+        if not candidates:
+            return None
+        index = _random_cell(rnd, candidates)
+        targets |= 1 << index
+        for piece_index, piece_type in solution:
+            attacks = ATTACKS[piece_type][piece_index]
+            if attacks & (1 << index):
+                covered |= attacks
+
+    return ([(index_cell(index), piece_type) for index, piece_type in solution],
+            [index_cell(index) for index in iter_bits(targets)])
+
+
+def level_rng(number, seed):
+    """Random stream for level number under seed; no two (number, seed) pairs share one"""
+    return random.Random(f"{seed}:{number}")
+
+
+def generate_level(number, seed=None):
+    """Generate level number; the same (number, seed) always gives the same level"""
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rnd = level_rng(number, seed)
+
+    retries = 0
+    if number == 1:
+        solution, targets = _level_one(rnd)
+    elif number == 2:
+        solution, targets = _level_two(rnd)
+    else:
+        while True:
+            layout = _grow_solution(rnd, number)
+            if layout:
+                solution, targets = layout
+                break
+            retries += 1
+
+    # Keep monoliths off the solution's pieces, targets and detonation zones
+    blocked = 0
+    for cell, piece_type in solution:
+        blocked |= cell_bit(cell) | ATTACKS[piece_type][cell_index(cell)]
+    for cell in targets:
+        blocked |= cell_bit(cell)
+    monoliths = _place_monoliths(rnd, number, blocked)
+
+    tray = [piece_type for _, piece_type in solution]
+    rnd.shuffle(tray)
+    return Level(number, seed, targets, monoliths, tray, solution, retries)
+
+
+def stress_level(size, seed=0, density=STRESS_DENSITY, tray=STRESS_TRAY_PIECES):
+    """A huge, sparsely filled size x size board for stress testing.
+
+    Pieces start on the board at random and a few more wait in the tray; there
+    is no known solution. Numbered 0, so clearing it moves on to level 1.
+    """
+    rnd = random.Random(seed)
+    pieces = max(1, int(size * size * density))
+    extras = max(1, pieces // 4)
+    indices = rnd.sample(range(size * size), pieces + 2 * extras)
+    cells = [(index % size, index // size) for index in indices]
+    placed = [(cell, rnd.choice((HORIZONTAL, DIAGONAL))) for cell in cells[:pieces]]
+    targets = cells[pieces:pieces + extras]
+    monoliths = cells[pieces + extras:]
+    tray_types = [rnd.choice((HORIZONTAL, DIAGONAL)) for _ in range(tray)]
+    return Level(0, seed, targets, monoliths, tray_types, [], size=size, placed=placed)
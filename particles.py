@@ -0,0 +1,226 @@
+"""Struct-of-arrays particle system.
+
+Every particle property lives in a preallocated NumPy array, so a frame is
+one vectorized update and one compaction pass however many particles are
+alive. A particle's look depends only on its color, kind and age, so each
+(color, ring start, age) sprite is rendered once and drawing is a single
+Surface.blits call.
+"""
+import math
+import numpy as np
+import pygame
+from config import CELL_SIZE, MAX_PARTICLES
+
+# Particle behaviour
+START_RADIUS = CELL_SIZE // 16
+MAX_RADIUS = START_RADIUS * 3
+GROWTH_RATE = 0.3
+FADE_RATE = 8
+LIFETIME = 40
+RING_SPEED = 2  # Speed at which rings expand
+RING_THICKNESS = 8
+RING_FADE_RADIUS = CELL_SIZE  # Rings fade faster beyond this radius
+RING_MAX_RADIUS = CELL_SIZE * 3  # Rings die beyond this radius
+MIN_SPEED, MAX_SPEED = 1, 3
+MIN_DISTANCE, MAX_DISTANCE = CELL_SIZE // 3, CELL_SIZE // 2
+
+FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'prev_x': np.float64,  # Position one simulation step ago, for interpolation
+    'prev_y': np.float64,
+    'angle': np.float64,
+    'speed': np.float64,
+    'distance': np.float64,
+    'max_distance': np.float64,
+    'alpha': np.int32,
+    'age': np.int32,
+    'ring_start': np.int32,  # Starting ring radius, -1 for plain particles
+    'color': np.int32  # Index into ParticleSystem.colors
+}
+
+
+class ParticleSystem:
+    """Pool of explosion particles and rings stored as parallel arrays"""
+
+    def __init__(self, capacity=MAX_PARTICLES, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        self.arrays = {name: np.zeros(capacity, dtype) for name, dtype in FIELDS.items()}
+        self.colors = []  # Palette of RGB tuples
+        self.color_index = {}
+        self.sprites = {}  # (color index, ring start, age) -> (Surface, offset)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _reserve(self, extra):
+        """Grow the pool if extra more particles would not fit"""
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        while self.capacity < needed:
+            self.capacity *= 2
+        for name, array in self.arrays.items():
+            grown = np.zeros(self.capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+
+    def _color(self, color):
+        color = tuple(color)
+        index = self.color_index.get(color)
+        if index is None:
+            index = len(self.colors)
+            self.colors.append(color)
+            self.color_index[color] = index
+        return index
+
+    def emit(self, x, y, color, count):
+        """Spawn count particles flying outward from (x, y)"""
+        self._spawn(x, y, color, np.full(count, -1))
+
+    def emit_rings(self, x, y, color, radii):
+        """Spawn one expanding ring per starting radius, centered on (x, y)"""
+        self._spawn(x, y, color, np.asarray(radii))
+
+    def _spawn(self, x, y, color, ring_starts):
+        count = len(ring_starts)
+        self._reserve(count)
+        new = slice(self.count, self.count + count)
+        arrays = self.arrays
+        arrays['x'][new] = x
+        arrays['y'][new] = y
+        arrays['prev_x'][new] = x
+        arrays['prev_y'][new] = y
+        arrays['angle'][new] = self.rng.uniform(0, 2 * math.pi, count)
+        arrays['speed'][new] = self.rng.uniform(MIN_SPEED, MAX_SPEED, count)
+        arrays['distance'][new] = 0
+        arrays['max_distance'][new] = self.rng.uniform(MIN_DISTANCE, MAX_DISTANCE, count)
+        arrays['alpha'][new] = 255
+        arrays['age'][new] = 0
+        arrays['ring_start'][new] = ring_starts
+        arrays['color'][new] = self._color(color)
+        self.count += count
+
+    def update(self):
+        """Advance every particle one step, then drop the dead ones in one pass"""
+        if not self.count:
+            return
+        live = slice(0, self.count)
+        x, y = self.arrays['x'][live], self.arrays['y'][live]
+        self.arrays['prev_x'][live] = x
+        self.arrays['prev_y'][live] = y
+        distance = self.arrays['distance'][live]
+        speed = self.arrays['speed'][live]
+        angle = self.arrays['angle'][live]
+        alpha = self.arrays['alpha'][live]
+        age = self.arrays['age'][live]
+        ring_start = self.arrays['ring_start'][live]
+        rings = ring_start >= 0
+
+        age += 1
+        np.maximum(alpha - FADE_RATE, 0, out=alpha)
+        ring_radius = ring_start + RING_SPEED * age
+        # Fade out faster when ring gets larger
+        fading = rings & (ring_radius > RING_FADE_RADIUS)
+        alpha[fading] = np.maximum(alpha[fading] - FADE_RATE * 2, 0)
+
+        # Move particles outward from their center until they reach their max distance
+        moving = ~rings & (distance < self.arrays['max_distance'][live])
+        x[moving] += np.cos(angle[moving]) * speed[moving]
+        y[moving] += np.sin(angle[moving]) * speed[moving]
+        distance[moving] += speed[moving]
+
+        alive = (age < LIFETIME) & (alpha > 0) & ~(rings & (ring_radius > RING_MAX_RADIUS))
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for array in self.arrays.values():
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+
+    def _sprite(self, color_index, ring_start, age, alpha):
+        key = (color_index, ring_start, age)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._render(self.colors[color_index], ring_start, age, alpha)
+            self.sprites[key] = sprite
+        return sprite
+
+    def _render(self, color, ring_start, age, alpha):
+        """Render one particle look; returns (Surface, offset of its center)"""
+        if ring_start >= 0:
+            ring_radius = ring_start + RING_SPEED * age
+            half = ring_radius + 1
+            surface = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+            # Draw expanding ring
+            pygame.draw.circle(surface, (*color, alpha), (half, half), ring_radius, RING_THICKNESS)
+            return surface, half
+
+        radius = START_RADIUS + GROWTH_RATE * age
+        surface = pygame.Surface((MAX_RADIUS * 2, MAX_RADIUS * 2), pygame.SRCALPHA)
+        # Draw outer glow
+        pygame.draw.circle(surface, (*color, alpha // 2), (MAX_RADIUS, MAX_RADIUS), radius)
+        # Draw inner core
+        pygame.draw.circle(surface, (*color, alpha), (MAX_RADIUS, MAX_RADIUS), radius // 2)
+        return surface, MAX_RADIUS
+
+    def draw(self, surface, blend=1.0, camera=None, clip=None):
+        """Draw blend of the way from the previous simulation step to the current one.
+
+        Positions are in world pixels and go through camera if given; sprites keep their size.
+        Only particles overlapping the screen rect clip are drawn, if given.
+        """
+        if not self.count:
+            return
+        live = slice(0, self.count)
+        prev_x, prev_y = self.arrays['prev_x'][live], self.arrays['prev_y'][live]
+        x = prev_x + (self.arrays['x'][live] - prev_x) * blend
+        y = prev_y + (self.arrays['y'][live] - prev_y) * blend
+        if camera:
+            x, y = camera.to_screen(x, y)
+        if clip is not None:
+            half = self._half_sizes(live) + 1
+            live = np.flatnonzero((x + half >= clip.left) & (x - half < clip.right) &
+                                  (y + half >= clip.top) & (y - half < clip.bottom))
+            x, y = x[live], y[live]
+        x = x.astype(np.int64).tolist()
+        y = y.astype(np.int64).tolist()
+        colors = self.arrays['color'][live].tolist()
+        ring_starts = self.arrays['ring_start'][live].tolist()
+        ages = self.arrays['age'][live].tolist()
+        alphas = self.arrays['alpha'][live].tolist()
+        blits = []
+        for i in range(len(x)):
+            sprite, offset = self._sprite(colors[i], ring_starts[i], ages[i], alphas[i])
+            blits.append((sprite, (x[i] - offset, y[i] - offset)))
+        surface.blits(blits, doreturn=False)
+
+    def _half_sizes(self, live):
+        """Half the sprite size of each particle in live"""
+        ring_start = self.arrays['ring_start'][live]
+        return np.where(ring_start >= 0, ring_start + RING_SPEED * self.arrays['age'][live] + 1, MAX_RADIUS)
+
+    def bounding_rect(self, camera=None):
+        """One screen rect around every live particle, or None when there are none"""
+        if not self.count:
+            return None
+        live = slice(0, self.count)
+        half = self._half_sizes(live)
+        # Cover both simulation steps so interpolated positions stay inside
+        x = np.minimum(self.arrays['x'][live], self.arrays['prev_x'][live])
+        y = np.minimum(self.arrays['y'][live], self.arrays['prev_y'][live])
+        if camera:
+            x, y = camera.to_screen(x, y)
+        left = int((x - half).min()) - 1
+        top = int((y - half).min()) - 1
+        x = np.maximum(self.arrays['x'][live], self.arrays['prev_x'][live])
+        y = np.maximum(self.arrays['y'][live], self.arrays['prev_y'][live])
+        if camera:
+            x, y = camera.to_screen(x, y)
+        right = int((x + half).max()) + 2
+        bottom = int((y + half).max()) + 2
+        return pygame.Rect(left, top, right - left, bottom - top)
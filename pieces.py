@@ -1,62 +1,67 @@
 import pygame
-import math
-import random
 from config import *
+from engine import cell_to_pixel
+from sprites import SPRITES, render_sprite
+from tracing import get_tracer
+
+TRACE = get_tracer("projectile")
 
 class ArtilleryPiece:
-    def __init__(self, game, x, y, piece_type):
+    def __init__(self, game, x, y, piece_type, in_tray=False):
         self.game = game
-        self.x = x
+        self.x = x  # Screen position in the tray, world position on the board
         self.y = y
         self.piece_type = piece_type
+        self.in_tray = in_tray
         
-        # Define firing directions based on piece type
-        if piece_type == HORIZONTAL:
-            # Cardinal directions (up, right, down, left)
-            self.directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        elif piece_type == DIAGONAL:
-            # Diagonal directions (up-right, down-right, down-left, up-left)
-            self.directions = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
-        else:
-            # Default to horizontal if unknown type
-            self.directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+        # Define firing directions based on piece type (default to horizontal if unknown type)
+        self.directions = list(PIECE_DIRECTIONS.get(piece_type, HORIZONTAL_DIRECTIONS))
         
         self.base_color = GREEN if piece_type == HORIZONTAL else RED
         self.highlight_color = tuple(min(c + 50, 255) for c in self.base_color)
         self.shadow_color = tuple(max(c - 50, 0) for c in self.base_color)
-        self.radius = CELL_SIZE // 3  # Main piece radius
-        self.turret_radius = CELL_SIZE // 6  # Central turret radius
-        self.barrel_radius = CELL_SIZE // 12  # Smaller barrel radius
-        self.barrel_offset = CELL_SIZE // 5  # Distance from center to barrel centers
         
-    def draw(self, surface):
-        center_x = self.x + CELL_SIZE // 2
-        center_y = self.y + CELL_SIZE // 2
+    def draw(self, surface, pos=None, cell_size=CELL_SIZE):
+        """Draw at screen position pos (default: x, y) scaled to cell_size"""
+        surface.blit(SPRITES.get(("piece", self.piece_type), cell_size, self.render_sprite),
+                     pos or (self.x, self.y))
+
+    def render_sprite(self, cell_size):
+        return render_sprite(self.render, cell_size)
+
+    def render(self, surface, x, y, cell_size):
+        """Draw the piece art for a cell_size tile with top-left corner (x, y)"""
+        radius = cell_size // 3  # Main piece radius
+        turret_radius = cell_size // 6  # Central turret radius
+        barrel_radius = cell_size // 12  # Smaller barrel radius
+        barrel_offset = cell_size // 5  # Distance from center to barrel centers
+        center_x = x + cell_size // 2
+        center_y = y + cell_size // 2
         
         # Draw main base shadow
         pygame.draw.circle(surface, self.shadow_color, 
-                         (center_x + 2, center_y + 2), self.radius)
+                         (center_x + 2, center_y + 2), radius)
         
         # Draw main base
         pygame.draw.circle(surface, self.base_color, 
-                         (center_x, center_y), self.radius)
+                         (center_x, center_y), radius)
         
         # Draw main base highlight
-        highlight_radius = self.radius * 3 // 4
+        highlight_radius = radius * 3 // 4
         pygame.draw.circle(surface, self.highlight_color, 
                          (center_x - 2, center_y - 2), highlight_radius)
         
         # Draw central turret shadow
         pygame.draw.circle(surface, self.shadow_color,
-                         (center_x + 1, center_y + 1), self.turret_radius)
+                         (center_x + 1, center_y + 1), turret_radius)
         
         # Draw central turret
         pygame.draw.circle(surface, self.base_color,
-                         (center_x, center_y), self.turret_radius)
+                         (center_x, center_y), turret_radius)
         
         # Draw turret highlight
         pygame.draw.circle(surface, self.highlight_color,
-                         (center_x - 1, center_y - 1), self.turret_radius // 2)
+                         (center_x - 1, center_y - 1), turret_radius // 2)
         
         # Draw barrels
         barrel_color = (200, 200, 200)  # Silver color
@@ -64,58 +69,65 @@ class ArtilleryPiece:
         
         for dx, dy in self.directions:
             # Calculate barrel position
-            barrel_x = center_x + dx * self.barrel_offset
-            barrel_y = center_y + dy * self.barrel_offset
+            barrel_x = center_x + dx * barrel_offset
+            barrel_y = center_y + dy * barrel_offset
             
             # Draw barrel shadow
             pygame.draw.circle(surface, (100, 100, 100),
-                             (barrel_x + 1, barrel_y + 1), self.barrel_radius)
+                             (barrel_x + 1, barrel_y + 1), barrel_radius)
             
             # Draw barrel
             pygame.draw.circle(surface, barrel_color,
-                             (barrel_x, barrel_y), self.barrel_radius)
+                             (barrel_x, barrel_y), barrel_radius)
             
             # Draw barrel interior
             pygame.draw.circle(surface, barrel_interior,
-                             (barrel_x, barrel_y), self.barrel_radius // 2)
+                             (barrel_x, barrel_y), barrel_radius // 2)
 
 class Target:
     def __init__(self, scene, x, y):
         self.scene = scene
         self.x = x
         self.y = y
-        self.radius = CELL_SIZE // 3
         
-    def draw(self, surface):
-        center_x = self.x + CELL_SIZE // 2
-        center_y = self.y + CELL_SIZE // 2
+    def draw(self, surface, pos=None, cell_size=CELL_SIZE):
+        surface.blit(SPRITES.get(("target",), cell_size, self.render_sprite), pos or (self.x, self.y))
+
+    def render_sprite(self, cell_size):
+        return render_sprite(self.render, cell_size)
+
+    def render(self, surface, x, y, cell_size):
+        """Draw the target art for a cell_size tile with top-left corner (x, y)"""
+        radius = cell_size // 3
+        center_x = x + cell_size // 2
+        center_y = y + cell_size // 2
         
         # Draw outer ring shadow
         pygame.draw.circle(surface, (180, 0, 0), 
-                         (center_x + 2, center_y + 2), self.radius)
+                         (center_x + 2, center_y + 2), radius)
         
         # Draw outer ring
         pygame.draw.circle(surface, RED, 
-                         (center_x, center_y), self.radius)
+                         (center_x, center_y), radius)
         
         # Draw middle ring shadow
         pygame.draw.circle(surface, (220, 220, 220), 
-                         (center_x + 2, center_y + 2), self.radius * 2 // 3)
+                         (center_x + 2, center_y + 2), radius * 2 // 3)
         
         # Draw middle ring
         pygame.draw.circle(surface, WHITE, 
-                         (center_x, center_y), self.radius * 2 // 3)
+                         (center_x, center_y), radius * 2 // 3)
         
         # Draw inner ring shadow
         pygame.draw.circle(surface, (180, 0, 0), 
-                         (center_x + 1, center_y + 1), self.radius // 3)
+                         (center_x + 1, center_y + 1), radius // 3)
         
         # Draw inner ring
         pygame.draw.circle(surface, RED, 
-                         (center_x, center_y), self.radius // 3)
+                         (center_x, center_y), radius // 3)
         
         # Draw highlight
-        highlight_radius = self.radius // 4
+        highlight_radius = radius // 4
         pygame.draw.circle(surface, (255, 100, 100), 
                          (center_x - 2, center_y - 2), highlight_radius)
 
@@ -124,21 +136,28 @@ class Monolith:
         self.scene = scene
         self.x = x
         self.y = y
-        self.width = CELL_SIZE * 2 // 3
-        self.height = CELL_SIZE * 2 // 3  # Make it more square
-        self.wall_thickness = CELL_SIZE // 8
         
-    def draw(self, surface):
+    def draw(self, surface, pos=None, cell_size=CELL_SIZE):
+        surface.blit(SPRITES.get(("monolith",), cell_size, self.render_sprite), pos or (self.x, self.y))
+
+    def render_sprite(self, cell_size):
+        return render_sprite(self.render, cell_size)
+
+    def render(self, surface, x, y, cell_size):
+        """Draw the monolith art for a cell_size tile with top-left corner (x, y)"""
+        width = cell_size * 2 // 3
+        height = cell_size * 2 // 3  # Make it more square
+        wall_thickness = cell_size // 8
         # Calculate base position (centered in the cell)
-        base_x = self.x + (CELL_SIZE - self.width) // 2
-        base_y = self.y + (CELL_SIZE - self.height) // 2
+        base_x = x + (cell_size - width) // 2
+        base_y = y + (cell_size - height) // 2
         
         # Draw shadow
         shadow_rect = pygame.Rect(
             base_x + 3,
             base_y + 3,
-            self.width,
-            self.height
+            width,
+            height
         )
         pygame.draw.rect(surface, (70, 70, 70), shadow_rect)
         
@@ -146,8 +165,8 @@ class Monolith:
         main_rect = pygame.Rect(
             base_x,
             base_y,
-            self.width,
-            self.height
+            width,
+            height
         )
         pygame.draw.rect(surface, (100, 100, 100), main_rect)
         
@@ -155,7 +174,7 @@ class Monolith:
         highlight_rect = pygame.Rect(
             base_x + 2,
             base_y + 2,
-            self.width - 4,
+            width - 4,
             10
         )
         pygame.draw.rect(surface, (130, 130, 130), highlight_rect)
@@ -167,37 +186,37 @@ class Monolith:
         
         # Draw front wall
         front_wall = pygame.Rect(
-            base_x + self.wall_thickness,
-            base_y + self.wall_thickness,
-            self.width - 2 * self.wall_thickness,
-            self.height - self.wall_thickness
+            base_x + wall_thickness,
+            base_y + wall_thickness,
+            width - 2 * wall_thickness,
+            height - wall_thickness
         )
         pygame.draw.rect(surface, wall_color, front_wall)
         
         # Draw side walls
         left_wall = pygame.Rect(
             base_x,
-            base_y + self.wall_thickness,
-            self.wall_thickness,
-            self.height - self.wall_thickness
+            base_y + wall_thickness,
+            wall_thickness,
+            height - wall_thickness
         )
         pygame.draw.rect(surface, wall_shadow, left_wall)
         
         right_wall = pygame.Rect(
-            base_x + self.width - self.wall_thickness,
-            base_y + self.wall_thickness,
-            self.wall_thickness,
-            self.height - self.wall_thickness
+            base_x + width - wall_thickness,
+            base_y + wall_thickness,
+            wall_thickness,
+            height - wall_thickness
         )
         pygame.draw.rect(surface, wall_shadow, right_wall)
         
         # Draw broken top
         top_points = [
             (base_x, base_y),
-            (base_x + self.width // 4, base_y - 5),
-            (base_x + self.width // 2, base_y - 10),
-            (base_x + 3 * self.width // 4, base_y - 5),
-            (base_x + self.width, base_y)
+            (base_x + width // 4, base_y - 5),
+            (base_x + width // 2, base_y - 10),
+            (base_x + 3 * width // 4, base_y - 5),
+            (base_x + width, base_y)
         ]
         pygame.draw.polygon(surface, wall_color, top_points)
         
@@ -205,187 +224,190 @@ class Monolith:
         crack_color = (60, 60, 60)
         # Vertical cracks
         for i in range(2):
-            crack_x = base_x + (i + 1) * self.width // 3
+            crack_x = base_x + (i + 1) * width // 3
             pygame.draw.line(
                 surface,
                 crack_color,
-                (crack_x, base_y + self.wall_thickness),
-                (crack_x, base_y + self.height - 10),
+                (crack_x, base_y + wall_thickness),
+                (crack_x, base_y + height - 10),
                 2
             )
         
         # Horizontal cracks
         for i in range(2):
-            crack_y = base_y + (i + 1) * self.height // 3
+            crack_y = base_y + (i + 1) * height // 3
             pygame.draw.line(
                 surface,
                 crack_color,
-                (base_x + self.wall_thickness, crack_y),
-                (base_x + self.width - self.wall_thickness, crack_y),
+                (base_x + wall_thickness, crack_y),
+                (base_x + width - wall_thickness, crack_y),
                 2
             )
 
+# Projectile flight
+PROJECTILE_STEPS = 50  # Simulation steps from launch to landing
+ARC_HEIGHT = CELL_SIZE // 2  # Maximum height of arc
+TRAJECTORIES = {}  # (direction, steps) -> [(dx, dy)] offsets from the launch point per step
+
+
+def trajectory(direction, steps=PROJECTILE_STEPS):
+    """Shared offsets of every step along the arc toward direction, computed once"""
+    key = (direction, steps)
+    path = TRAJECTORIES.get(key)
+    if path is None:
+        # Quadratic Bezier from the launch point to the next cell's center,
+        # with the control point ARC_HEIGHT above the midpoint
+        end_x, end_y = direction[0] * CELL_SIZE, direction[1] * CELL_SIZE
+        control_x, control_y = end_x / 2, end_y / 2 - ARC_HEIGHT
+        path = []
+        for step in range(steps + 1):
+            t = step / steps
+            path.append((2 * (1 - t) * t * control_x + t * t * end_x,
+                         2 * (1 - t) * t * control_y + t * t * end_y))
+        path[-1] = (end_x, end_y)  # Land exactly on the cell center
+        path = TRAJECTORIES[key] = tuple(path)
+    return path
+
+
+# Every firing direction is known up front, so build their tables at import
+for directions in PIECE_DIRECTIONS.values():
+    for direction in directions:
+        trajectory(direction)
+
+
 class Projectile:
-    def __init__(self, game, start_x, start_y, direction):
+    """A shot in flight: a launch point and a step index into its direction's trajectory table"""
+
+    radius = CELL_SIZE // 8
+    color = (255, 200, 0)  # Bright yellow
+    trail_length = 5  # Trail points drawn behind the projectile
+
+    def __init__(self, game, start_x, start_y, direction, steps=PROJECTILE_STEPS, source=None):
         self.game = game
-        self.x = start_x
-        self.y = start_y
+        self.source = source  # Piece that fired it
         self.direction = direction
-        self.speed = CELL_SIZE // 4  # Reset speed to original value
-        self.radius = CELL_SIZE // 8
-        self.color = (255, 200, 0)  # Bright yellow
-        self.trail_length = 5  # Increased trail length
-        self.trail = []  # Store previous positions for trail effect
-        
-        # Arc trajectory parameters
-        self.arc_height = CELL_SIZE // 2  # Maximum height of arc
-        self.progress = 0  # Progress along trajectory (0 to 1)
-        self.progress_increment = 0.02  # More steps (50 total)
         self.start_pos = (start_x, start_y)
+        self.path = trajectory(direction, steps)
+        self.steps = steps
+        self.step = 0
         # Calculate target position (center of the target cell)
         self.target_pos = (
             start_x + direction[0] * CELL_SIZE,
             start_y + direction[1] * CELL_SIZE
         )
-        
+
+    def position(self, step):
+        offset_x, offset_y = self.path[step]
+        return self.start_pos[0] + offset_x, self.start_pos[1] + offset_y
+
+    @property
+    def x(self):
+        return self.start_pos[0] + self.path[self.step][0]
+
+    @property
+    def y(self):
+        return self.start_pos[1] + self.path[self.step][1]
+
+    @property
+    def prev_x(self):
+        """Position one simulation step ago, for interpolation"""
+        return self.start_pos[0] + self.path[max(self.step - 1, 0)][0]
+
+    @property
+    def prev_y(self):
+        return self.start_pos[1] + self.path[max(self.step - 1, 0)][1]
+
+    @property
+    def progress(self):
+        """Progress along trajectory (0 to 1)"""
+        return self.step / self.steps
+
+    @property
+    def trail(self):
+        """Positions of the last trail_length steps, oldest first.
+
+        The shared table already holds every earlier position, so the trail
+        is a window onto it rather than a list kept per projectile.
+        """
+        return [self.position(step) for step in range(max(self.step - self.trail_length, 0), self.step)]
+
     def update(self):
-        # Add current position to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > self.trail_length:
-            self.trail.pop(0)
-            
-        # Update progress along arc
-        old_progress = self.progress
-        self.progress += self.progress_increment
-        print(f"Projectile progress: {self.progress} (increment: {self.progress_increment}, old: {old_progress})")  # Debug print
-        if self.progress >= 1.0:
-            self.progress = 1.0
-            self.x = self.target_pos[0]
-            self.y = self.target_pos[1]
-            return
-            
-        # Calculate position along arc
-        t = self.progress
-        # Calculate midpoint
-        mid_x = (self.start_pos[0] + self.target_pos[0]) / 2
-        mid_y = (self.start_pos[1] + self.target_pos[1]) / 2
-        
-        # Calculate control point (above midpoint)
-        control_point = (
-            mid_x,
-            mid_y - self.arc_height
-        )
+        if self.step < self.steps:
+            self.step += 1
+        TRACE.debug("Projectile step: %s of %s", self.step, self.steps)
         
-        # Calculate new position using quadratic bezier
-        new_x = (1-t)**2 * self.start_pos[0] + 2*(1-t)*t * control_point[0] + t**2 * self.target_pos[0]
-        new_y = (1-t)**2 * self.start_pos[1] + 2*(1-t)*t * control_point[1] + t**2 * self.target_pos[1]
-        
-        # Update position
-        self.x = new_x
-        self.y = new_y
-        
-    def draw(self, surface):
-        # Draw trail
-        for i, (trail_x, trail_y) in enumerate(self.trail):
-            alpha = int(255 * (i + 1) / (len(self.trail) + 1))
-            trail_surface = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(trail_surface, (*self.color, alpha), 
-                             (self.radius, self.radius), self.radius)
-            surface.blit(trail_surface, (trail_x - self.radius, trail_y - self.radius))
-            
-        # Draw projectile
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
+    def draw(self, surface, blend=1.0, camera=None):
+        """Draw blend of the way from the previous simulation step to the current one.
+
+        The trail is not drawn here; TRAILS.draw does every projectile's trail in one batch.
+        """
+        x = self.prev_x + (self.x - self.prev_x) * blend
+        y = self.prev_y + (self.y - self.prev_y) * blend
+        if camera:
+            x, y = camera.to_screen(x, y)
+        pygame.draw.circle(surface, self.color, (int(x), int(y)), self.radius)
         
     def is_off_screen(self):
         return self.progress >= 1.0
 
-class Particle:
-    def __init__(self, game, x, y, color, is_ring=False, ring_radius=0):
-        self.game = game
-        self.x = x
-        self.y = y
-        self.color = color
-        self.radius = CELL_SIZE // 16  # Half the original size
-        self.max_radius = self.radius * 3  # Increased max size
-        self.growth_rate = 0.3  # Slower growth
-        self.fade_rate = 8  # Slower fade
-        self.alpha = 255
-        self.lifetime = 40  # Longer lifetime
-        
-        # Ring-specific properties
-        self.is_ring = is_ring
-        self.ring_radius = ring_radius
-        self.ring_speed = 2  # Speed at which the ring expands
-        self.ring_thickness = 8  # Doubled from 4 to 8
-        
-        # Add some randomness to the explosion
-        self.angle = random.uniform(0, 2 * math.pi)
-        self.speed = random.uniform(1, 3)  # Slower movement
-        self.distance = 0
-        self.max_distance = random.uniform(CELL_SIZE // 3, CELL_SIZE // 2)
-        print(f"New particle created at ({x}, {y}) with lifetime {self.lifetime}")
-        
-    def update(self):
-        # Always update particle properties
-        self.radius += self.growth_rate
-        self.alpha = max(0, self.alpha - self.fade_rate)
-        self.lifetime -= 1
-        
-        if self.is_ring:
-            # Update ring radius
-            self.ring_radius += self.ring_speed
-            # Fade out faster when ring gets larger
-            if self.ring_radius > CELL_SIZE:
-                self.alpha = max(0, self.alpha - self.fade_rate * 2)
-        else:
-            # Move particle outward from center if not at max distance
-            if self.distance < self.max_distance:
-                move_x = math.cos(self.angle) * self.speed
-                move_y = math.sin(self.angle) * self.speed
-                self.x += move_x
-                self.y += move_y
-                self.distance += self.speed
-            
-        print(f"Particle at ({self.x}, {self.y}) - alpha: {self.alpha}, lifetime: {self.lifetime}")
-        
-    def draw(self, surface):
-        if self.alpha <= 0:
-            return
-            
-        if self.is_ring:
-            # Create surface for ring with alpha
-            ring_surface = pygame.Surface((self.ring_radius * 4, self.ring_radius * 4), pygame.SRCALPHA)
-            
-            # Draw expanding ring
-            pygame.draw.circle(ring_surface, (*self.color, self.alpha),
-                             (self.ring_radius * 2, self.ring_radius * 2),
-                             self.ring_radius, self.ring_thickness)
-            
-            # Blit to main surface
-            surface.blit(ring_surface, 
-                        (self.x - self.ring_radius * 2, self.y - self.ring_radius * 2))
-        else:
-            # Create surface for particle with alpha
-            particle_surface = pygame.Surface((self.max_radius * 2, self.max_radius * 2), pygame.SRCALPHA)
-            
-            # Draw outer glow
-            pygame.draw.circle(particle_surface, (*self.color, self.alpha // 2),
-                             (self.max_radius, self.max_radius), self.radius)
-            
-            # Draw inner core
-            pygame.draw.circle(particle_surface, (*self.color, self.alpha),
-                             (self.max_radius, self.max_radius), self.radius // 2)
-            
-            # Blit to main surface
-            surface.blit(particle_surface, 
-                        (self.x - self.max_radius, self.y - self.max_radius))
-        print(f"Drawing particle at ({self.x}, {self.y}) with alpha {self.alpha}")
-        
-    def is_dead(self):
-        # Particle is dead when either its lifetime is up or it's fully faded out
-        # For rings, also check if they've expanded too far
-        is_dead = (self.lifetime <= 0 or self.alpha <= 0 or 
-                  (self.is_ring and self.ring_radius > CELL_SIZE * 3))  # Increased from 2 to 3 tile diameters
-        if is_dead:
-            print(f"Particle at ({self.x}, {self.y}) is dead - lifetime: {self.lifetime}, alpha: {self.alpha}")
-        return is_dead 
\ No newline at end of file
+    def bounding_rect(self, camera=None):
+        """Screen area covered by the projectile and its trail"""
+        rect = None
+        for x, y in self.trail + [(self.x, self.y)]:
+            if camera:
+                x, y = camera.to_screen(x, y)
+            point_rect = pygame.Rect(int(x) - self.radius, int(y) - self.radius,
+                                     self.radius * 2 + 1, self.radius * 2 + 1)
+            rect = rect.union(point_rect) if rect else point_rect
+        return rect
+
+class TrailRenderer:
+    """Graded-alpha trail dots, rendered once per (color, radius, alpha) and batch-blitted"""
+
+    def __init__(self):
+        self.sprites = {}
+        self.alphas = {}  # Trail length -> alpha of each point, oldest first
+
+    def sprite(self, color, radius, alpha):
+        key = (color, radius, alpha)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+            if pygame.display.get_surface():
+                sprite = sprite.convert_alpha()
+            self.sprites[key] = sprite
+        return sprite
+
+    def trail_alphas(self, length):
+        alphas = self.alphas.get(length)
+        if alphas is None:
+            alphas = self.alphas[length] = [int(255 * (i + 1) / (length + 1)) for i in range(length)]
+        return alphas
+
+    def draw(self, surface, projectiles, camera=None):
+        """Draw the trails of all projectiles with a single Surface.blits call"""
+        blits = []
+        for projectile in projectiles:
+            trail = projectile.trail
+            radius = projectile.radius
+            for (trail_x, trail_y), alpha in zip(trail, self.trail_alphas(len(trail))):
+                if camera:
+                    trail_x, trail_y = camera.to_screen(trail_x, trail_y)
+                blits.append((self.sprite(projectile.color, radius, alpha),
+                              (trail_x - radius, trail_y - radius)))
+        if blits:
+            surface.blits(blits, doreturn=False)
+
+
+# Shared by every projectile
+TRAILS = TrailRenderer()
+
+def create_level_objects(game, level):
+    """Build the pieces, targets and monoliths Game uses for a generated level"""
+    pieces = [ArtilleryPiece(game, *cell_to_pixel(cell), piece_type) for cell, piece_type in level.placed]
+    pieces += [ArtilleryPiece(game, *game.tray_slot_pos(slot), piece_type, in_tray=True)
+               for slot, piece_type in enumerate(level.tray)]
+    targets = [Target(game, *cell_to_pixel(cell)) for cell in level.targets]
+    monoliths = [Monolith(game, *cell_to_pixel(cell)) for cell in level.monoliths]
+    return pieces, targets, monoliths
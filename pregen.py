@@ -0,0 +1,150 @@
+"""Background level pre-generation with an on-disk cache.
+
+LevelPool keeps the next few levels generating and verifying in worker
+processes while the current one is played, so a level transition is a cache
+read instead of a stall in the 60 FPS loop. Verified levels are stored in a
+LevelCache keyed by (seed, level number) and reused by later runs; the least
+recently used entries are evicted once the cache is full.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import LEVEL_CACHE_DIR, LEVEL_CACHE_MAX_ENTRIES, PREGEN_LEVELS_AHEAD
+from engine import resolve_chain
+from levels import GENERATOR_VERSION, Level, generate_level
+from tracing import get_tracer
+
+PREGEN_TRACE = get_tracer("pregen")
+
+
+class LevelCache:
+    """Verified levels on disk, one JSON file per (seed, level number)"""
+
+    def __init__(self, directory=LEVEL_CACHE_DIR, max_entries=LEVEL_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, seed, number):
+        # Levels from an older generator are never read back; eviction removes them in time
+        return os.path.join(self.directory, f"level-v{GENERATOR_VERSION}-{seed}-{number}.json")
+
+    def load(self, seed, number):
+        """Return the cached Level, or None on a miss"""
+        path = self.path(seed, number)
+        try:
+            with open(path) as f:
+                level = Level.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return level
+
+    def contains(self, seed, number):
+        return os.path.exists(self.path(seed, number))
+
+    def store(self, level):
+        # Write then rename so readers never see a half-written file
+        path = self.path(level.seed, level.number)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(level.to_dict(), f)
+        os.replace(temp_path, path)
+
+    def evict(self):
+        """Remove the least recently used entries beyond max_entries"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith("level-") and name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def verify_level(level):
+    """Check that the level's stored solution clears every target without touching a monolith"""
+    result = resolve_chain(level.solution_board, level.start)
+    return result.all_targets_hit and not result.monoliths_hit
+
+
+def generate_verified_level(number, seed):
+    level = generate_level(number, seed)
+    if not verify_level(level):
+        raise ValueError(f"Generated level {number} (seed {seed}) failed verification")
+    return level
+
+
+def build_level(number, seed, cache_dir, max_entries):
+    """Worker entry point: generate, verify and cache one level, then trim the cache"""
+    level = generate_verified_level(number, seed)
+    cache = LevelCache(cache_dir, max_entries)
+    cache.store(level)
+    cache.evict()
+    return level.to_dict()
+
+
+class LevelPool:
+    """Generates levels ahead of play in a process pool, backed by a LevelCache"""
+
+    def __init__(self, seed, ahead=PREGEN_LEVELS_AHEAD, cache=None, workers=None):
+        self.seed = seed
+        self.ahead = ahead
+        self.cache = cache or LevelCache()
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.pending = {}  # Level number -> Future
+
+    def prefetch(self, number):
+        """Start generating levels number .. number + ahead - 1 that are not cached yet"""
+        for upcoming in range(number, number + self.ahead):
+            if upcoming in self.pending or self.cache.contains(self.seed, upcoming):
+                continue
+            self.pending[upcoming] = self.executor.submit(
+                build_level, upcoming, self.seed, self.cache.directory, self.cache.max_entries)
+
+    def get(self, number):
+        """Return level number, then queue the levels after it.
+
+        Blocks only if the level is neither cached nor finished in the background.
+        If the background build failed, the level is loaded or built here instead.
+        """
+        future = self.pending.pop(number, None)
+        level = None
+        if future is not None:
+            try:
+                level = Level.from_dict(future.result())
+            except BrokenProcessPool as error:
+                PREGEN_TRACE.error("Level pool crashed building level %s: %r", number, error)
+                self.restart()
+            except Exception as error:
+                PREGEN_TRACE.error("Background build of level %s failed: %r", number, error)
+        if level is None:
+            level = self.cache.load(self.seed, number)
+        if level is None:
+            level = generate_verified_level(number, self.seed)
+            self.cache.store(level)
+            # Scanning the cache directory is left to a worker, off the game loop
+            self.executor.submit(self.cache.evict)
+        self.prefetch(number + 1)
+        return level
+
+    def restart(self):
+        """Replace a broken executor; every level it was building is queued again by prefetch"""
+        self.close()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def close(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,93 @@
+"""Per-phase frame profiler.
+
+Game marks the end of each phase of a frame with lap(phase); the time since
+the previous lap is charged to that phase, so instrumenting a frame costs
+one perf_counter() call per phase. Finished frames feed rolling windows used
+for percentiles and the on-screen overlay, and a longer per-frame trace that
+can be exported as CSV or JSON.
+"""
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+import pygame
+from config import PROFILE_WINDOW, PROFILE_TRACE_FRAMES, BLACK, WHITE
+
+PHASES = ("events", "detonation", "particles", "scene_layer", "composite", "present")
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Times the phases of Game.update and Game.draw frame by frame"""
+
+    def __init__(self, window=PROFILE_WINDOW, trace_frames=PROFILE_TRACE_FRAMES):
+        self.frame = dict.fromkeys(PHASES, 0.0)  # Seconds per phase in the current frame
+        self.frame_start = self.last_lap = time.perf_counter()
+        self.frame_number = 0
+        self.window = {phase: deque(maxlen=window) for phase in PHASES + ("total",)}
+        self.trace = deque(maxlen=trace_frames)  # Finished frames, oldest dropped first
+        self.overlay = False
+        self.font = None
+
+    def start_frame(self):
+        self.frame_start = self.last_lap = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to phase"""
+        now = time.perf_counter()
+        self.frame[phase] += now - self.last_lap
+        self.last_lap = now
+
+    def end_frame(self):
+        frame = self.frame
+        frame["total"] = self.last_lap - self.frame_start
+        for phase, samples in self.window.items():
+            samples.append(frame[phase])
+        self.trace.append((self.frame_number, frame))
+        self.frame_number += 1
+        self.frame = dict.fromkeys(PHASES, 0.0)
+
+    def percentiles(self, phase):
+        """p50/p95/p99 of phase over the rolling window, in milliseconds"""
+        samples = self.window[phase]
+        if not samples:
+            return (0.0,) * len(PERCENTILES)
+        return tuple(np.percentile(np.fromiter(samples, float), PERCENTILES) * 1000)
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+
+    def overlay_lines(self):
+        lines = ["phase        p50    p95    p99 ms"]
+        for phase in PHASES + ("total",):
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f"{phase:<11}{p50:>6.2f} {p95:>6.2f} {p99:>6.2f}")
+        return lines
+
+    def overlay_rect(self, x, y):
+        """Screen area the overlay covers when drawn at (x, y)"""
+        return pygame.Rect(x, y, 260, 16 * (len(PHASES) + 2) + 8)
+
+    def draw_overlay(self, surface, x, y):
+        if self.font is None:
+            self.font = pygame.font.SysFont("monospace", 14)
+        rect = self.overlay_rect(x, y)
+        pygame.draw.rect(surface, BLACK, rect)
+        for i, line in enumerate(self.overlay_lines()):
+            surface.blit(self.font.render(line, True, WHITE), (x + 4, y + 4 + 16 * i))
+
+    def export(self, path):
+        """Write the per-frame trace to path, as JSON if it ends in .json and CSV otherwise"""
+        fields = PHASES + ("total",)
+        if path.endswith(".json"):
+            frames = [{"frame": number, **{field: frame[field] for field in fields}}
+                      for number, frame in self.trace]
+            with open(path, "w") as f:
+                json.dump(frames, f)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + fields)
+            for number, frame in self.trace:
+                writer.writerow([number] + [frame[field] for field in fields])
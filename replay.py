@@ -0,0 +1,170 @@
+"""Deterministic input recording and headless replay.
+
+InputRecorder writes every frame of a session to a gzipped JSON-lines log:
+a header with the level, campaign seed and RNG seed, then one line per frame
+with the frame time, mouse position and the input events Game handles, plus
+a state hash every few frames. Replayer feeds that log back into a fresh Game
+as fast as the machine allows, optionally without drawing, and reports any
+checkpoint whose state hash differs from the recording.
+
+Usage:
+    python replay.py record session.log [--level 1] [--seed 1] [--board-size 512]
+    python replay.py play session.log [--no-draw] [--no-check]
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+import pygame
+from config import CAMPAIGN_SEED, REPLAY_CHECKPOINT_INTERVAL
+from game import Game
+
+LOG_VERSION = 1
+
+# Event type -> attributes Game reads from it
+EVENT_FIELDS = {
+    pygame.QUIT: (),
+    pygame.MOUSEBUTTONDOWN: ("pos", "button"),
+    pygame.MOUSEBUTTONUP: ("pos", "button"),
+    pygame.MOUSEMOTION: ("pos",),
+    pygame.KEYDOWN: ("key",),
+    pygame.MOUSEWHEEL: ("x", "y"),
+}
+
+
+def encode_event(event):
+    """[type, attribute values...], or None for events Game ignores"""
+    fields = EVENT_FIELDS.get(event.type)
+    if fields is None:
+        return None
+    return [event.type] + [getattr(event, field) for field in fields]
+
+
+def decode_event(record):
+    event_type, *values = record
+    attributes = dict(zip(EVENT_FIELDS[event_type], values))
+    if "pos" in attributes:
+        attributes["pos"] = tuple(attributes["pos"])
+    return pygame.event.Event(event_type, attributes)
+
+
+class InputRecorder:
+    """Logs a Game's input frame by frame; attach with game.recorder = InputRecorder(path, game)"""
+
+    def __init__(self, path, game, checkpoint_interval=REPLAY_CHECKPOINT_INTERVAL):
+        self.file = gzip.open(path, "wt")
+        self.checkpoint_interval = checkpoint_interval
+        self.frame = 0
+        header = {
+            "version": LOG_VERSION,
+            "level": game.level.number,
+            "board_size": game.board_size,
+            "seed": game.level_pool.seed,
+            "rng_seed": game.rng_seed,
+            "speed": game.sim_clock.multiplier,
+            "instant_resolve": game.instant_resolve,
+            "checkpoint_interval": checkpoint_interval,
+        }
+        self.file.write(json.dumps(header) + "\n")
+
+    def record(self, game, dt, mouse_pos, events):
+        """Log one frame's input, before Game handles it"""
+        events = [record for record in map(encode_event, events) if record is not None]
+        line = [dt, mouse_pos[0], mouse_pos[1], events]
+        if self.frame % self.checkpoint_interval == 0:
+            line.append(game.state_hash())
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.frame += 1
+
+    def close(self):
+        self.file.close()
+
+
+class ReplayResult:
+    def __init__(self, frames, elapsed, checkpoints, mismatches):
+        self.frames = frames
+        self.elapsed = elapsed
+        self.checkpoints = checkpoints
+        self.mismatches = mismatches  # [(frame, recorded hash, replayed hash)]
+
+
+class Replayer:
+    """Plays a recorded log back into a new Game"""
+
+    def __init__(self, path):
+        with gzip.open(path, "rt") as f:
+            self.header = json.loads(f.readline())
+            if self.header["version"] != LOG_VERSION:
+                raise ValueError(f"Unsupported replay log version {self.header['version']}")
+            self.frames = [json.loads(line) for line in f]
+
+    def new_game(self):
+        header = self.header
+        game = Game(header["level"], header["seed"], header["rng_seed"], header.get("board_size"))
+        game.sim_clock.set_multiplier(header["speed"])
+        game.instant_resolve = header["instant_resolve"]
+        return game
+
+    def run(self, game=None, draw=True, check=True):
+        """Replay every frame up to the recorded quit, as fast as possible"""
+        game = game or self.new_game()
+        played = checkpoints = 0
+        mismatches = []
+        start = time.perf_counter()
+        try:
+            for number, (dt, mouse_x, mouse_y, events, *checkpoint) in enumerate(self.frames):
+                if check and checkpoint:
+                    checkpoints += 1
+                    replayed = game.state_hash()
+                    if replayed != checkpoint[0]:
+                        mismatches.append((number, checkpoint[0], replayed))
+                events = [decode_event(record) for record in events]
+                quit_at = next((i for i, event in enumerate(events) if event.type == pygame.QUIT), None)
+                if quit_at is not None:
+                    events = events[:quit_at]
+                game.update(dt, events, (mouse_x, mouse_y))
+                if draw:
+                    game.draw()
+                played += 1
+                if quit_at is not None:
+                    break
+        finally:
+            game.level_pool.close()
+            game.hints.close()
+        return ReplayResult(played, time.perf_counter() - start, checkpoints, mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="play normally while recording input")
+    record.add_argument("path")
+    record.add_argument("--level", type=int, default=1)
+    record.add_argument("--seed", type=int, default=CAMPAIGN_SEED)
+    record.add_argument("--board-size", type=int, help="record on a generated stress board of this size")
+    play = commands.add_parser("play", help="replay a log headless")
+    play.add_argument("path")
+    play.add_argument("--no-draw", action="store_true", help="skip rendering, simulate only")
+    play.add_argument("--no-check", action="store_true", help="skip state hash checkpoints")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        game = Game(args.level, args.seed, board_size=args.board_size)
+        game.recorder = InputRecorder(args.path, game)
+        game.run()
+        return
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    result = Replayer(args.path).run(draw=not args.no_draw, check=not args.no_check)
+    print(f"{result.frames} frames in {result.elapsed:.2f}s ({result.frames / max(result.elapsed, 1e-9):.0f} frames/s), "
+          f"{result.checkpoints} checkpoints, {len(result.mismatches)} mismatches")
+    for frame, recorded, replayed in result.mismatches:
+        print(f"  frame {frame}: recorded {recorded}, replayed {replayed}")
+    if result.mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
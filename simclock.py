@@ -0,0 +1,52 @@
+"""Fixed-timestep simulation clock.
+
+The simulation advances in steps of exactly 1 / SIMULATION_HZ seconds no
+matter how fast frames are rendered. Each frame feeds in the real time that
+passed, scaled by the playback multiplier, and gets back how many steps to
+run; the leftover fraction of a step is exposed as blend so drawing can
+interpolate between the last two simulation states.
+"""
+from config import SIMULATION_HZ, MAX_SPEED_MULTIPLIER, MAX_FRAME_TIME
+
+STEP = 1 / SIMULATION_HZ  # Seconds of game time per simulation step
+
+
+class SimulationClock:
+    """Turns real frame times into a whole number of fixed simulation steps"""
+
+    def __init__(self, multiplier=1):
+        self.multiplier = 1
+        self.set_multiplier(multiplier)
+        self.accumulator = 0.0  # Pending simulation time, in steps
+        self.steps = 0  # Total steps taken
+
+    def set_multiplier(self, multiplier):
+        """Set playback speed, clamped to 1x .. MAX_SPEED_MULTIPLIER x"""
+        self.multiplier = max(1, min(MAX_SPEED_MULTIPLIER, int(multiplier)))
+
+    def faster(self):
+        self.set_multiplier(self.multiplier * 2)
+
+    def slower(self):
+        self.set_multiplier(self.multiplier // 2)
+
+    def advance(self, dt=STEP):
+        """Add dt seconds of real time; returns the number of steps to simulate.
+
+        Long frames are clamped to MAX_FRAME_TIME so a stall slows the game
+        down instead of making it try to catch up all at once.
+        """
+        self.accumulator += min(dt, MAX_FRAME_TIME) * SIMULATION_HZ * self.multiplier
+        # Round away float error so that dt == STEP always gives whole steps
+        steps = int(self.accumulator + 1e-9)
+        self.accumulator = max(0.0, self.accumulator - steps)
+        self.steps += steps
+        return steps
+
+    @property
+    def blend(self):
+        """How far the display is between the previous and the current step (0 to 1)"""
+        return min(self.accumulator, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
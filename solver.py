@@ -0,0 +1,268 @@
+"""Level solver.
+
+Finds where to put the tray pieces and which piece to fire first so that the
+chain reaction hits every target. A solution is grown as a chain: the start
+piece goes on any empty cell, and every further piece goes on an empty cell
+that the chain already lands on, so it is guaranteed to fire. The search is a
+depth-first search over these placements with:
+
+- a reachability bound: with r pieces left the chain can only grow r tiles,
+  so any target further than that from the current landing zone is a dead end
+- a hitter bound: unhit targets more than 2 tiles apart can never share the
+  piece that hits them, so each needs a piece of its own; targets that an
+  unfired fixed piece attacks are left out, since the chain may set that
+  piece off instead
+- a transposition table of failed states keyed on a canonical board hash, so
+  the same chain reached in a different placement order is searched once
+- reduction by the board's 8 dihedral symmetries when the level's targets,
+  monoliths and fixed pieces are symmetric (firing patterns always are)
+"""
+from config import BOARD_SIZE
+from bitboard import (ATTACKS, FULL_MASK, NUM_CELLS, BitBoard, cell_index,
+                      dilate, index_cell, iter_bits, popcount)
+
+
+def _build_transforms():
+    """Index permutations for the 8 symmetries of the square board"""
+    last = BOARD_SIZE - 1
+    maps = [
+        lambda c, r: (c, r),
+        lambda c, r: (last - r, c),
+        lambda c, r: (last - c, last - r),
+        lambda c, r: (r, last - c),
+        lambda c, r: (last - c, r),
+        lambda c, r: (c, last - r),
+        lambda c, r: (r, c),
+        lambda c, r: (last - r, last - c)
+    ]
+    transforms = []
+    for cell_map in maps:
+        transforms.append([cell_index(cell_map(*index_cell(index))) for index in range(NUM_CELLS)])
+    return transforms
+
+
+TRANSFORMS = _build_transforms()
+
+CANCEL_CHECK_NODES = 256  # Search nodes between polls of a cancelled callback
+
+# Chebyshev distance between two cells, the number of pieces a chain needs to cover it
+DISTANCE = [[max(abs(a[0] - b[0]), abs(a[1] - b[1])) for b in map(index_cell, range(NUM_CELLS))]
+            for a in map(index_cell, range(NUM_CELLS))]
+
+
+def transform_mask(mask, permutation):
+    result = 0
+    for index in iter_bits(mask):
+        result |= 1 << permutation[index]
+    return result
+
+
+class Solution:
+    """Where to place pieces and which piece to fire first"""
+
+    def __init__(self, start, placements, nodes):
+        self.start = start  # Cell of the piece to fire first
+        self.placements = placements  # [(cell, piece_type)] tray pieces to place, start included
+        self.nodes = nodes  # Search nodes expanded
+
+    def __repr__(self):
+        return f"Solution(start={self.start}, placements={self.placements}, nodes={self.nodes})"
+
+
+class Solver:
+    """Depth-first level solver with a transposition table and symmetry reduction"""
+
+    def __init__(self, board, tray, avoid_monoliths=True, use_symmetry=True, max_nodes=200000, cancelled=None):
+        self.bitboard = BitBoard.from_board(board)
+        self.types = list(self.bitboard.pieces)  # Fixed order for state keys
+        self.fixed = dict(self.bitboard.pieces)  # Pieces already on the board
+        self.fixed_mask = self.bitboard.piece_mask
+        self.targets = self.bitboard.targets
+        self.monoliths = self.bitboard.monoliths
+        self.blocked = self.bitboard.occupied
+        self.counts = tuple(list(tray).count(piece_type) for piece_type in self.types)
+        self.avoid_monoliths = avoid_monoliths
+        self.max_nodes = max_nodes
+        self.symmetries = self._level_symmetries() if use_symmetry else [TRANSFORMS[0]]
+        self.failed = set()  # Transposition table of canonical keys known to fail
+        self.nodes = 0
+        self.cancelled = cancelled  # Optional callable polled during the search; True stops it
+        self.stopped = False
+
+    def _level_symmetries(self):
+        """Board symmetries that leave targets, monoliths and fixed pieces in place"""
+        symmetries = []
+        for permutation in TRANSFORMS:
+            masks = [self.targets, self.monoliths] + list(self.fixed.values())
+            if all(transform_mask(mask, permutation) == mask for mask in masks):
+                symmetries.append(permutation)
+        return symmetries
+
+    def _key(self, chain, counts):
+        """Canonical hash of a search state: chain masks under the best symmetry, plus tray counts"""
+        masks = tuple(chain[piece_type] for piece_type in self.types)
+        if len(self.symmetries) > 1:
+            masks = min(tuple(transform_mask(mask, permutation) for mask in masks)
+                        for permutation in self.symmetries)
+        return masks, counts
+
+    def _fire(self, chain, landed, index, piece_type):
+        """Add a hit piece to the chain, then any fixed pieces it sets off"""
+        chain = dict(chain)
+        chain[piece_type] |= 1 << index
+        landed |= ATTACKS[piece_type][index]
+        while True:
+            fired = 0
+            for fixed_type, fixed_mask in self.fixed.items():
+                hit = landed & fixed_mask & ~chain[fixed_type]
+                if hit:
+                    fired |= hit
+                    chain[fixed_type] |= hit
+                    for hit_index in iter_bits(hit):
+                        landed |= ATTACKS[fixed_type][hit_index]
+            if not fired:
+                return chain, landed
+
+    def _reach(self, landed, remaining):
+        """Tiles the chain could still land on with remaining pieces (an upper bound)"""
+        reach = landed
+        for _ in range(remaining):
+            reach = dilate(reach)
+        # Fixed pieces inside that reach can carry the chain further
+        while True:
+            extra = 0
+            for fixed_type, fixed_mask in self.fixed.items():
+                for index in iter_bits(reach & fixed_mask):
+                    extra |= ATTACKS[fixed_type][index]
+            if not extra & ~reach:
+                return reach
+            reach |= extra
+            for _ in range(remaining):
+                reach = dilate(reach)
+
+    def _fixed_cover(self, chain):
+        """Tiles attacked by fixed pieces the chain has not fired yet"""
+        cover = 0
+        for fixed_type, fixed_mask in self.fixed.items():
+            for index in iter_bits(fixed_mask & ~chain[fixed_type]):
+                cover |= ATTACKS[fixed_type][index]
+        return cover
+
+    def _hitters_needed(self, unhit):
+        """Lower bound on pieces still needed: unhit targets that pairwise cannot share a hitter"""
+        chosen = []
+        for target in iter_bits(unhit):
+            distances = DISTANCE[target]
+            if all(distances[other] > 2 for other in chosen):
+                chosen.append(target)
+        return len(chosen)
+
+    def _order(self, moves, unhit):
+        """Sort (index, type_index, piece_type) moves: new target hits first, then nearest the unhit targets overall"""
+        unhit_indices = list(iter_bits(unhit))
+
+        def score(move):
+            index, _, piece_type = move
+            distances = DISTANCE[index]
+            return (-popcount(ATTACKS[piece_type][index] & unhit),
+                    sum(distances[target] for target in unhit_indices))
+        moves.sort(key=score)
+        return moves
+
+    def _search(self, chain, landed, counts, placements):
+        if not self.targets & ~landed:
+            return placements
+        self.nodes += 1
+        if self.cancelled is not None and self.nodes % CANCEL_CHECK_NODES == 0 and self.cancelled():
+            self.stopped = True
+        remaining = sum(counts)
+        if remaining == 0 or self.gave_up:
+            return None
+        unhit = self.targets & ~landed
+        if self._hitters_needed(unhit & ~self._fixed_cover(chain)) > remaining:
+            return None
+        if self.targets & ~self._reach(landed, remaining):
+            return None
+
+        key = self._key(chain, counts)
+        if key in self.failed:
+            return None
+
+        occupied = self.blocked
+        for mask in chain.values():
+            occupied |= mask
+        candidates = landed & ~occupied & FULL_MASK
+        moves = []
+        for type_index, piece_type in enumerate(self.types):
+            if not counts[type_index]:
+                continue
+            for index in iter_bits(candidates):
+                attacks = ATTACKS[piece_type][index]
+                if self.avoid_monoliths and attacks & self.monoliths:
+                    continue
+                moves.append((index, type_index, piece_type))
+
+        for index, type_index, piece_type in self._order(moves, unhit):
+            next_chain, next_landed = self._fire(chain, landed, index, piece_type)
+            if self.avoid_monoliths and next_landed & self.monoliths:
+                continue
+            next_counts = counts[:type_index] + (counts[type_index] - 1,) + counts[type_index + 1:]
+            result = self._search(next_chain, next_landed, next_counts,
+                                  placements + [(index_cell(index), piece_type)])
+            if result is not None:
+                return result
+
+        self.failed.add(key)
+        return None
+
+    def _starts(self):
+        """Candidate first pieces: fixed pieces, then a tray piece on any empty cell"""
+        empty_chain = {piece_type: 0 for piece_type in self.types}
+        for piece_type, fixed_mask in self.fixed.items():
+            for index in iter_bits(fixed_mask):
+                yield index, piece_type, None
+        moves = []
+        seen = set()
+        for type_index, piece_type in enumerate(self.types):
+            if not self.counts[type_index]:
+                continue
+            for index in iter_bits(~self.blocked & FULL_MASK):
+                # Skip starts that are a symmetric image of one already tried
+                chain = dict(empty_chain)
+                chain[piece_type] = 1 << index
+                key = self._key(chain, self.counts)
+                if key in seen:
+                    continue
+                seen.add(key)
+                moves.append((index, type_index, piece_type))
+        for index, type_index, piece_type in self._order(moves, self.targets):
+            yield index, piece_type, type_index
+
+    def solve(self):
+        """Return a Solution, or None if no chain hits every target"""
+        empty_chain = {piece_type: 0 for piece_type in self.types}
+        for index, piece_type, type_index in self._starts():
+            chain, landed = self._fire(empty_chain, 0, index, piece_type)
+            if self.avoid_monoliths and landed & self.monoliths:
+                continue
+            counts = self.counts
+            placements = []
+            if type_index is not None:
+                counts = counts[:type_index] + (counts[type_index] - 1,) + counts[type_index + 1:]
+                placements = [(index_cell(index), piece_type)]
+            result = self._search(chain, landed, counts, placements)
+            if result is not None:
+                return Solution(index_cell(index), result, self.nodes)
+            if self.gave_up:
+                break
+        return None
+
+    @property
+    def gave_up(self):
+        """Whether the search stopped early, so a None from solve() does not prove the level unsolvable"""
+        return self.stopped or self.nodes > self.max_nodes
+
+
+def solve(board, tray, **kwargs):
+    """Solve a level given its engine.Board (targets, monoliths, fixed pieces) and tray piece types"""
+    return Solver(board, tray, **kwargs).solve()
@@ -0,0 +1,52 @@
+"""Pre-rendered sprite cache.
+
+Board objects are drawn from many pygame.draw calls. Each visual variant is
+rendered once per cell size into a Surface and blitted from then on. The
+cache keeps sprites for the few most recently introduced cell sizes (tray
+pieces stay full size while the board is zoomed) and drops the oldest size
+when another one is needed, so sprites are rebuilt automatically after a
+resize or zoom.
+"""
+import pygame
+
+
+def render_sprite(render, cell_size, margin=0):
+    """Run render(surface, x, y, cell_size) into a new transparent tile-sized Surface.
+
+    margin adds room on every side for art that extends past the tile.
+    """
+    size = cell_size + 2 * margin
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    render(sprite, margin, margin, cell_size)
+    if pygame.display.get_surface():
+        # Match the display's pixel format so blits take the fast path
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+class SpriteCache:
+    """Surfaces keyed by variant, for up to max_sizes cell sizes"""
+
+    def __init__(self, max_sizes=3):
+        self.max_sizes = max_sizes
+        self.sizes = {}  # Cell size -> {key: Surface}, oldest size first
+
+    def get(self, key, cell_size, render):
+        """Return the sprite for key, calling render(cell_size) to build it on a miss"""
+        sprites = self.sizes.get(cell_size)
+        if sprites is None:
+            if len(self.sizes) >= self.max_sizes:
+                del self.sizes[next(iter(self.sizes))]
+            sprites = self.sizes[cell_size] = {}
+        sprite = sprites.get(key)
+        if sprite is None:
+            sprite = render(cell_size)
+            sprites[key] = sprite
+        return sprite
+
+    def clear(self):
+        self.sizes = {}
+
+
+# Shared by every piece, target and monolith
+SPRITES = SpriteCache()
@@ -0,0 +1,13 @@
+"""Random boards shared by the tests"""
+from config import BOARD_SIZE, DIAGONAL, HORIZONTAL
+from engine import Board
+
+
+def random_board(rng, size=BOARD_SIZE):
+    cells = [(col, row) for col in range(size) for row in range(size)]
+    rng.shuffle(cells)
+    pieces = rng.randrange(4, 20)
+    targets = rng.randrange(1, 6)
+    monoliths = rng.randrange(0, 4)
+    return Board({cell: rng.choice((HORIZONTAL, DIAGONAL)) for cell in cells[:pieces]},
+                 cells[pieces:pieces + targets], cells[pieces + targets:pieces + targets + monoliths], size)
@@ -0,0 +1,31 @@
+import random
+import numpy as np
+from batch import encode_boards, evaluate
+from boards import random_board
+from engine import resolve_chain
+
+
+def cells(mask):
+    return {(int(col), int(row)) for row, col in zip(*np.nonzero(mask))}
+
+
+def test_evaluate_matches_resolve_chain():
+    for seed in range(20):
+        rng = random.Random(seed)
+        boards = [random_board(rng) for _ in range(8)]
+        starts = [rng.choice(list(board.pieces)) for board in boards]
+        result = evaluate(encode_boards(boards), np.array(starts))
+        for i, (board, start) in enumerate(zip(boards, starts)):
+            expected = resolve_chain(board, start)
+            assert cells(result.fired[i]) == set(expected.firing_order)
+            assert cells(result.targets_hit_mask[i]) == set(expected.targets_hit)
+            assert cells(result.monoliths_hit_mask[i]) == set(expected.monoliths_hit)
+            assert result.solved[i] == (expected.all_targets_hit and not expected.monoliths_hit)
+
+
+def test_start_without_piece_fires_nothing():
+    board = random_board(random.Random(0))
+    empty = next((col, row) for col in range(board.size) for row in range(board.size) if board.is_empty((col, row)))
+    result = evaluate(encode_boards([board]), np.array([empty]))
+    assert result.pieces_fired[0] == 0
+    assert result.targets_hit[0] == 0
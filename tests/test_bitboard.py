@@ -0,0 +1,48 @@
+import random
+from bitboard import BitBoard
+from boards import random_board
+from config import BOARD_SIZE, DIAGONAL, HORIZONTAL
+
+CELLS = [(col, row) for col in range(-1, BOARD_SIZE + 1) for row in range(-1, BOARD_SIZE + 1)]
+
+
+def test_round_trip():
+    for seed in range(20):
+        board = random_board(random.Random(seed))
+        round_trip = BitBoard.from_board(board).to_board()
+        assert round_trip.pieces == board.pieces
+        assert round_trip.targets == board.targets
+        assert round_trip.monoliths == board.monoliths
+
+
+def test_matches_board():
+    for seed in range(20):
+        board = random_board(random.Random(seed))
+        bitboard = BitBoard.from_board(board)
+        for cell in CELLS:
+            assert bitboard.in_bounds(cell) == board.in_bounds(cell)
+            assert bitboard.is_empty(cell) == board.is_empty(cell)
+            for piece_type in (HORIZONTAL, DIAGONAL):
+                assert sorted(bitboard.zone_cells(cell, piece_type)) == sorted(board.zone_cells(cell, piece_type))
+
+
+def test_moves_follow_board():
+    rng = random.Random(0)
+    board = random_board(rng)
+    bitboard = BitBoard.from_board(board)
+    for _ in range(200):
+        if rng.random() < 0.5 and board.pieces:
+            cell = rng.choice(sorted(board.pieces))
+            bitboard.remove_piece(cell, board.pieces[cell])
+            board.remove_piece(cell, board.pieces[cell])
+        elif board.targets and rng.random() < 0.1:
+            cell = rng.choice(sorted(board.targets))
+            bitboard.remove_target(cell)
+            board.remove_target(cell)
+        else:
+            cell, piece_type = rng.choice(CELLS), rng.choice((HORIZONTAL, DIAGONAL))
+            if board.is_empty(cell):
+                bitboard.add_piece(cell, piece_type)
+                board.add_piece(cell, piece_type)
+        assert bitboard.to_board().pieces == board.pieces
+        assert set(bitboard.to_board().targets) == board.targets
@@ -0,0 +1,76 @@
+import random
+from boards import random_board
+from config import DIAGONAL, HORIZONTAL
+from engine import Board, HitGraph, resolve_chain
+
+
+def assert_same_chain(result, expected):
+    assert result.firing_order == expected.firing_order
+    assert result.targets_hit == expected.targets_hit
+    assert result.monoliths_hit == expected.monoliths_hit
+
+
+def empty_cells(board):
+    return [(col, row) for col in range(board.size) for row in range(board.size) if board.is_empty((col, row))]
+
+
+def test_hit_graph_matches_resolve_chain():
+    for seed in range(20):
+        board = random_board(random.Random(seed))
+        graph = HitGraph(board)
+        for start in board.pieces:
+            assert_same_chain(graph.chain(start), resolve_chain(board, start))
+
+
+def test_hit_graph_follows_incremental_changes():
+    for seed in range(10):
+        rng = random.Random(seed)
+        board = random_board(rng)
+        graph = HitGraph(board)
+        for _ in range(50):
+            roll = rng.random()
+            if roll < 0.4 and board.pieces:
+                cell = rng.choice(list(board.pieces))
+                board.remove_piece(cell, board.pieces[cell])
+                graph.remove_piece(cell)
+            elif roll < 0.9 and empty_cells(board):
+                cell, piece_type = rng.choice(empty_cells(board)), rng.choice((HORIZONTAL, DIAGONAL))
+                board.add_piece(cell, piece_type)
+                graph.add_piece(cell, piece_type)
+            elif board.targets:
+                cell = rng.choice(sorted(board.targets))
+                board.remove_target(cell)
+                graph.remove_target(cell)
+            for start in board.pieces:
+                assert_same_chain(graph.chain(start), resolve_chain(board, start))
+
+
+def test_preview_leaves_graph_unchanged():
+    rng = random.Random(0)
+    board = random_board(rng)
+    graph = HitGraph(board)
+    start = next(iter(board.pieces))
+    for cell in empty_cells(board):
+        for piece_type in (HORIZONTAL, DIAGONAL):
+            placed = Board({**board.pieces, cell: piece_type}, board.targets, board.monoliths)
+            assert_same_chain(graph.preview(cell, piece_type), resolve_chain(placed, cell))
+            assert_same_chain(graph.preview(cell, piece_type, start), resolve_chain(placed, start))
+    for start in board.pieces:
+        assert_same_chain(graph.chain(start), resolve_chain(board, start))
+
+
+def test_hit_graph_key_follows_changes():
+    rng = random.Random(0)
+    board = random_board(rng)
+    graph = HitGraph(board)
+    start_key = graph.key
+    cell = rng.choice(empty_cells(board))
+    graph.add_piece(cell, HORIZONTAL)
+    assert graph.key != start_key
+    assert graph.key == HitGraph(Board({**board.pieces, cell: HORIZONTAL}, board.targets, board.monoliths)).key
+    graph.remove_piece(cell)
+    assert graph.key == start_key
+    target = next(iter(board.targets))
+    graph.remove_target(target)
+    assert graph.key != start_key
+    assert graph.key == HitGraph(Board(board.pieces, board.targets - {target}, board.monoliths)).key
@@ -0,0 +1,45 @@
+import time
+from config import HORIZONTAL
+from engine import Board
+from hints import HintService, find_hint
+
+
+def wait_for_hint(service):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        hint = service.poll()
+        if hint is not None:
+            return hint
+        time.sleep(0.01)
+    raise AssertionError("no hint within 10 seconds")
+
+
+def test_hint_places_a_tray_piece():
+    hint = find_hint(Board({}, [(3, 3)], []), [HORIZONTAL])
+    assert hint.placement is not None
+    assert hint.clears and hint.complete
+
+
+def test_hint_on_a_large_board_is_incomplete():
+    # Too large for the solver, so the tray is not searched
+    board = Board({(0, 0): HORIZONTAL}, [(10, 10)], [], size=16)
+    hint = find_hint(board, [HORIZONTAL])
+    assert hint.start == (0, 0)
+    assert not hint.complete
+    assert find_hint(board, []).complete
+
+
+def test_service_caches_only_complete_hints():
+    service = HintService()
+    try:
+        small = Board({}, [(3, 3)], [])
+        assert service.request("small", [HORIZONTAL], small.copy) is None
+        assert wait_for_hint(service).complete
+        assert service.request("small", [HORIZONTAL], small.copy) is not None
+
+        large = Board({(0, 0): HORIZONTAL}, [(10, 10)], [], size=16)
+        assert service.request("large", [HORIZONTAL], large.copy) is None
+        assert not wait_for_hint(service).complete
+        assert "large" not in service.cache
+    finally:
+        service.close()
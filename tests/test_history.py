@@ -0,0 +1,84 @@
+import random
+from history import MoveHistory
+
+
+class Piece:
+    def __init__(self, x, y, in_tray=False):
+        self.x, self.y, self.in_tray = x, y, in_tray
+
+
+def positions(pieces):
+    return [(piece.x, piece.y, piece.in_tray) for piece in pieces]
+
+
+def apply(changes):
+    for piece, x, y, in_tray in changes:
+        piece.x, piece.y, piece.in_tray = x, y, in_tray
+
+
+def play(history, pieces, rng, moves):
+    """Make random moves, returning the positions after each one"""
+    states = []
+    for _ in range(moves):
+        piece = rng.choice(pieces)
+        old = (piece.x, piece.y, piece.in_tray)
+        piece.x, piece.y, piece.in_tray = rng.randrange(100), rng.randrange(100), rng.random() < 0.2
+        history.record(piece, old, (piece.x, piece.y, piece.in_tray))
+        states.append(positions(pieces))
+    return states
+
+
+def test_undo_redo():
+    rng = random.Random(0)
+    pieces = [Piece(i, i) for i in range(3)]
+    history = MoveHistory(pieces, snapshot_interval=4, max_moves=16)
+    start = positions(pieces)
+    states = [start] + play(history, pieces, rng, 10)
+    for move in range(9, -1, -1):
+        apply(history.undo())
+        assert positions(pieces) == states[move]
+    assert not history.can_undo and history.undo() == []
+    for move in range(1, 11):
+        apply(history.redo())
+        assert positions(pieces) == states[move]
+    assert not history.can_redo and history.redo() == []
+
+
+def test_record_drops_redo_branch():
+    rng = random.Random(1)
+    pieces = [Piece(i, i) for i in range(3)]
+    history = MoveHistory(pieces, snapshot_interval=4, max_moves=16)
+    states = [positions(pieces)] + play(history, pieces, rng, 9)
+    for _ in range(6):
+        apply(history.undo())
+    states = states[:4] + play(history, pieces, rng, 5)
+    assert not history.can_redo
+    assert history.last == 8
+    for move in range(8):
+        apply(history.jump(move))
+        assert positions(pieces) == states[move]
+
+
+def test_jump_across_trimming():
+    rng = random.Random(2)
+    pieces = [Piece(i, i) for i in range(4)]
+    history = MoveHistory(pieces, snapshot_interval=4, max_moves=16)
+    start = positions(pieces)
+    states = [start] + play(history, pieces, rng, 50)
+    # Only the last max_moves moves are kept, dropped a snapshot interval at a time
+    assert history.first > 0
+    assert history.last - history.first <= 16
+    moves = list(range(history.first, history.last + 1))
+    for move in rng.sample(moves, len(moves)) + [history.first, history.last, history.first]:
+        apply(history.jump(move))
+        assert positions(pieces) == states[move]
+        assert history.position == move
+    # Undo stops at the oldest retained move
+    while history.can_undo:
+        apply(history.undo())
+    assert history.position == history.first
+    assert positions(pieces) == states[history.first]
+    # The level start is always reachable, but with nothing to redo
+    apply(history.jump(0))
+    assert positions(pieces) == start
+    assert history.position == 0 and not history.can_redo
@@ -0,0 +1,14 @@
+from levels import generate_level, level_rng
+from pregen import verify_level
+
+
+def test_same_seed_and_number_give_the_same_level():
+    first, second = generate_level(5, 7), generate_level(5, 7)
+    assert verify_level(first)
+    assert first.to_dict() == second.to_dict()
+
+
+def test_seed_and_number_do_not_alias():
+    # Seeding with seed * 1000 + number gave these pairs the same stream
+    assert level_rng(1000, 0).random() != level_rng(0, 1).random()
+    assert level_rng(1003, 0).random() != level_rng(3, 1).random()
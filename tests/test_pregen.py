@@ -0,0 +1,35 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from levels import generate_level
+from pregen import LevelCache, LevelPool, verify_level
+
+
+def failed(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+def test_get_falls_back_when_background_build_fails(tmp_path):
+    pool = LevelPool(0, ahead=1, cache=LevelCache(str(tmp_path)), workers=1)
+    try:
+        pool.pending[3] = failed(ValueError("generator failed"))
+        level = pool.get(3)
+        assert verify_level(level)
+        assert level.to_dict() == generate_level(3, 0).to_dict()
+        assert pool.cache.contains(0, 3)
+    finally:
+        pool.close()
+
+
+def test_get_restarts_a_broken_pool(tmp_path):
+    pool = LevelPool(0, ahead=1, cache=LevelCache(str(tmp_path)), workers=1)
+    try:
+        broken = pool.executor
+        pool.pending[2] = failed(BrokenProcessPool("worker died"))
+        assert verify_level(pool.get(2))
+        assert pool.executor is not broken
+        # The replacement pool builds the next level
+        assert pool.get(3).to_dict() == generate_level(3, 0).to_dict()
+    finally:
+        pool.close()
@@ -0,0 +1,44 @@
+from collections import Counter
+from config import DIAGONAL, HORIZONTAL
+from engine import Board, resolve_chain
+from levels import generate_level
+from solver import solve
+
+
+def assert_solves(board, solution):
+    placed = Board({**board.pieces, **dict(solution.placements)}, board.targets, board.monoliths)
+    result = resolve_chain(placed, solution.start)
+    assert result.all_targets_hit
+    assert not result.monoliths_hit
+
+
+def test_solves_single_piece_level():
+    board = Board({}, [(3, 3)], [])
+    solution = solve(board, [HORIZONTAL])
+    assert solution is not None
+    assert_solves(board, solution)
+
+
+def test_solves_generated_levels():
+    for number in range(1, 16):
+        level = generate_level(number, 0)
+        board = Board(dict(level.placed), level.targets, level.monoliths, level.size)
+        solution = solve(board, level.tray)
+        assert solution is not None, f"level {number}"
+        assert not Counter(piece_type for _, piece_type in solution.placements) - Counter(level.tray)
+        assert all(board.is_empty(cell) for cell, _ in solution.placements)
+        assert_solves(board, solution)
+
+
+def test_fixed_pieces_can_hit_targets_the_tray_does_not():
+    # One tray piece bridges (1, 1) to a row of fixed pieces that hit the other two targets
+    fixed = {(1, 1): HORIZONTAL, (3, 2): DIAGONAL, (4, 1): DIAGONAL, (5, 2): DIAGONAL, (6, 3): DIAGONAL}
+    board = Board(fixed, [(0, 1), (4, 3), (7, 4)], [])
+    solution = solve(board, [DIAGONAL])
+    assert solution is not None
+    assert_solves(board, solution)
+
+
+def test_unsolvable_level():
+    board = Board({}, [(0, 0), (7, 7)], [])
+    assert solve(board, [HORIZONTAL]) is None
@@ -0,0 +1,118 @@
+"""Leveled, buffered tracing for code that runs every frame.
+
+Each subsystem gets a Tracer with its own level. A message below that level
+costs one method call: the tracer's level methods are swapped for a no-op
+and the message is never formatted. Its arguments are still evaluated by the
+caller, so arguments that take work to compute belong behind
+tracer.enabled(level). Enabled messages are stored unformatted
+in an in-memory ring buffer and written out by a background thread, so the
+game loop never waits on stdout. When the buffer is full the oldest
+messages are dropped.
+"""
+import atexit
+import sys
+import threading
+from collections import deque
+from config import TRACE_DEFAULT_LEVEL, TRACE_LEVELS, TRACE_BUFFER_SIZE, TRACE_FLUSH_INTERVAL
+
+LEVELS = {"off": 0, "error": 1, "info": 2, "debug": 3}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+def _discard(message, *args):
+    pass
+
+
+class TraceBuffer:
+    """Ring buffer of pending messages, drained by a background writer thread"""
+
+    def __init__(self, size=TRACE_BUFFER_SIZE, stream=None, interval=TRACE_FLUSH_INTERVAL):
+        self.records = deque(maxlen=size)
+        self.stream = stream
+        self.interval = interval
+        self.wake = threading.Event()
+        self.lock = threading.Lock()  # Serializes writers, not producers
+        self.thread = None
+
+    def append(self, record):
+        # deque.append is atomic, so producers never take a lock
+        self.records.append(record)
+        if self.thread is None:
+            self.start()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="trace-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Format and write everything buffered so far"""
+        with self.lock:
+            lines = []
+            while True:
+                try:
+                    subsystem, level, message, args = self.records.popleft()
+                except IndexError:
+                    break
+                if args:
+                    message = message % args
+                lines.append(f"[{subsystem}] {LEVEL_NAMES[level]}: {message}\n")
+            if lines:
+                stream = self.stream or sys.stdout
+                stream.write("".join(lines))
+                stream.flush()
+
+
+BUFFER = TraceBuffer()
+
+
+class Tracer:
+    """Per-subsystem message source; use get_tracer to obtain one"""
+
+    def __init__(self, subsystem, level=TRACE_DEFAULT_LEVEL, buffer=BUFFER):
+        self.subsystem = subsystem
+        self.buffer = buffer
+        self.set_level(level)
+
+    def set_level(self, level):
+        """Set the most verbose level emitted, by name or number"""
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        for name in ("error", "info", "debug"):
+            if LEVELS[name] <= self.level:
+                setattr(self, name, self._emitter(LEVELS[name]))
+            else:
+                setattr(self, name, _discard)
+
+    def enabled(self, level):
+        return LEVELS[level] <= self.level
+
+    def _emitter(self, level):
+        def emit(message, *args):
+            """Queue message % args; formatting happens on the writer thread"""
+            self.buffer.append((self.subsystem, level, message, args))
+        return emit
+
+
+_tracers = {}
+
+
+def get_tracer(subsystem):
+    """Return the shared Tracer for subsystem, at its configured level"""
+    tracer = _tracers.get(subsystem)
+    if tracer is None:
+        tracer = _tracers[subsystem] = Tracer(subsystem, TRACE_LEVELS.get(subsystem, TRACE_DEFAULT_LEVEL))
+    return tracer
+
+
+def set_level(subsystem, level):
+    get_tracer(subsystem).set_level(level)
+
+
+def flush():
+    BUFFER.flush()